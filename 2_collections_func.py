@@ -1,5 +1,10 @@
+import json
 import random
 import string
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
 
 # Generate random dictionaries and return a list of them
@@ -30,6 +35,29 @@ def generate_random_dict(n):
     return dict_elem
 
 
+# Generate random dictionaries in chunks, drawing all sizes, keys and values of a chunk at once
+# Keys and values have the same distribution as in generate_random_dict_list(): 2-10 draws of a lowercase
+# letter key (repeated keys keep the last value) and a value from 0 to 100
+def iter_random_dict_chunks(cnt_elements, chunk_size=10000, seed=None):
+    # Use a separate generator, so results are reproducible for the same seed
+    generator = random.Random(seed)
+
+    for chunk_start in range(0, cnt_elements, chunk_size):
+        chunk_len = min(chunk_size, cnt_elements - chunk_start)
+        # Draw number of elements for each dictionary of the chunk
+        sizes = generator.choices(range(2, 11), k=chunk_len)
+        # Draw keys and values for all dictionaries of the chunk
+        keys = iter(generator.choices(string.ascii_lowercase, k=sum(sizes)))
+        values = iter(generator.choices(range(101), k=sum(sizes)))
+        # Build dictionaries from consecutive slices of keys and values
+        yield [dict(zip(islice(keys, n), islice(values, n))) for n in sizes]
+
+
+# Generate a list of random dictionaries using batched generation
+def generate_random_dict_list_batched(cnt_elements, seed=None):
+    return [random_dict for chunk in iter_random_dict_chunks(cnt_elements, seed=seed) for random_dict in chunk]
+
+
 # Merge two dictionaries with custom rules for duplicate keys
 def merge_dicts(dict1, dict2, index):
     merged = dict1.copy()
@@ -46,22 +74,132 @@ def merge_dicts(dict1, dict2, index):
     return merged
 
 
-# Create one dictionary from a list of dictionaries
+# Create one dictionary from a list or any other iterable of dictionaries in a single pass
+# Memory usage depends only on the number of distinct keys, so dictionaries can be streamed
 def combine_dict_list(dict_list):
     # Initialize an empty dictionary to accumulate results
     result_dict = {}
+    # Map each base key to its current name in result_dict ('a' or 'a_3')
+    result_keys = {}
+
+    # Iterate over each dictionary with its 1-based index
+    for index, current_dict in enumerate(dict_list, start=1):
+        for key, value in current_dict.items():
+            existing_key = result_keys.get(key)
+            if existing_key is None:
+                # Key is seen for the first time, take it as is
+                result_dict[key] = value
+                result_keys[key] = key
+            elif value > result_dict[existing_key]:  # Keep the max value
+                # Rename the key with the index of the dictionary holding the max value
+                new_key = f"{key}_{index}"
+                del result_dict[existing_key]
+                result_dict[new_key] = value
+                result_keys[key] = new_key
 
-    # Iterate over each dictionary in the list
-    for current_dict in dict_list:
-        # Find the index of the current dictionary in the list and add 1 for 1-based index
-        index = dict_list.index(current_dict) + 1
+    return result_dict
 
-        # Merge the current dictionary into the result_dict using merge_dicts()
-        result_dict = merge_dicts(result_dict, current_dict, index)
 
+# Read dictionaries one by one from a JSON-lines file (one JSON object per line)
+def iter_json_lines(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Skip empty lines
+            if line.strip():
+                yield json.loads(line)
+
+
+# Create one dictionary from a JSON-lines file without loading the whole file into memory
+def combine_json_lines_file(file_path, workers=None, partition_size=10000):
+    dicts = iter_json_lines(file_path)
+    if workers:
+        return combine_dicts_parallel(dicts, workers, partition_size)
+    return combine_dict_list(dicts)
+
+
+# Summarize a partition of dictionaries for parallel merging
+# For each key: (max value, index of the first dictionary with max value, key position in that dictionary,
+# index of the first dictionary with the key)
+def summarize_dicts(dict_list, start_index):
+    summary = {}
+    for index, current_dict in enumerate(dict_list, start=start_index):
+        for position, (key, value) in enumerate(current_dict.items()):
+            key_summary = summary.get(key)
+            if key_summary is None:
+                summary[key] = (value, index, position, index)
+            elif value > key_summary[0]:  # Keep the first dictionary with the max value
+                summary[key] = (value, index, position, key_summary[3])
+    return summary
+
+
+# Merge summary of a later partition into summary of an earlier one
+def merge_summaries(summary, later_summary):
+    for key, later_key_summary in later_summary.items():
+        key_summary = summary.get(key)
+        if key_summary is None:
+            summary[key] = later_key_summary
+        elif later_key_summary[0] > key_summary[0]:
+            summary[key] = later_key_summary[:3] + (key_summary[3],)
+    return summary
+
+
+# Build the combined dictionary from the summary of all dictionaries
+def build_combined_dict(summary):
+    result_dict = {}
+    # A key ends up where it was last added: in the dictionary with max value at its position there
+    for key, (value, index, position, first_index) in sorted(summary.items(), key=lambda item: item[1][1:3]):
+        # Key keeps its name if the max value is in the first dictionary with this key
+        result_dict[key if index == first_index else f"{key}_{index}"] = value
     return result_dict
 
 
+# Create one dictionary from an iterable of dictionaries merging partitions in worker processes
+# Only a limited number of partitions is read ahead, so the input can be larger than memory
+def combine_dicts_parallel(dicts, workers=4, partition_size=10000):
+    dicts = iter(dicts)
+    summary = {}
+    pending = deque()
+    start_index = 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Submit next partitions while there are free slots
+            while len(pending) < workers * 2 and (partition := list(islice(dicts, partition_size))):
+                pending.append(executor.submit(summarize_dicts, partition, start_index))
+                start_index += len(partition)
+            if not pending:
+                break
+            # Reduce partial results in the partition order
+            summary = merge_summaries(summary, pending.popleft().result())
+
+    return build_combined_dict(summary)
+
+
+# Compare single-pass combine_dict_list() with the previous implementation based on merge_dicts()
+def benchmark_combine_dict_list(cnt_elements=20000, seed=1):
+    random.seed(seed)
+    dict_list = generate_random_dict_list(cnt_elements)
+
+    # Previous implementation: index lookup and dictionary copy for each merged dictionary
+    start = time.perf_counter()
+    previous_result = {}
+    for current_dict in dict_list:
+        previous_result = merge_dicts(previous_result, current_dict, dict_list.index(current_dict) + 1)
+    previous_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result_dict = combine_dict_list(dict_list)
+    single_pass_time = time.perf_counter() - start
+
+    # Results can differ only when equal dictionaries repeat, as index() returns the first one
+    has_repeats = len({tuple(d.items()) for d in dict_list}) < len(dict_list)
+    print(f"Dictionaries: {cnt_elements}")
+    print(f"merge_dicts loop: {previous_time:.3f} s")
+    print(f"combine_dict_list: {single_pass_time:.3f} s ({previous_time / single_pass_time:.0f}x faster)")
+    print(f"Identical results: {result_dict == previous_result and list(result_dict) == list(previous_result)}"
+          f"{' (list contains repeated dictionaries)' if has_repeats else ''}")
+
+
 # Main function to generate, merge, and print dictionaries
 def create_list():
     # Generate random number of dictionaries
@@ -54,28 +54,7 @@ class Publication:
 
     def split_text(self, p_text: list) -> str:
         # Split into lines with max_length, keeping whole words intact
-        formatted_text = []
-
-        for line in p_text:
-            words = line.strip().split()  # Split each line into words
-            current_line = ""
-
-            for word in words:
-                # Check if adding the next word would exceed the max_length
-                if len(current_line) + len(word) + 1 > self.max_length:
-                    formatted_text.append(current_line)  # Append the current line to the result
-                    current_line = word  # Start a new line with the current word
-                else:
-                    if current_line:
-                        current_line += " " + word  # Add the word to the current line with a space
-                    else:
-                        current_line = word  # Start a new line if current_line is empty
-
-            if current_line:
-                formatted_text.append(current_line)  # Append any remaining words in current_line
-
-        # Join the formatted text with newline characters and return it as a single string
-        return '\n'.join(formatted_text)
+        return strings_func_4.wrap_lines(p_text, self.max_length)
 
     @staticmethod
     def get_valid_expiration_date() -> str:
@@ -150,6 +129,55 @@ class Joke(Publication):
         return f"{base_format}{self.info_line}"
 
 
+class FeedWriter:
+    """Buffered writer keeping the feed file open and writing publications in batches."""
+
+    def __init__(self, p_file_path: str, p_max_buffer_size: int = 1 << 20, p_max_count: int = 1000):
+        self.file_path = p_file_path
+        self.max_buffer_size = p_max_buffer_size
+        self.max_count = p_max_count
+        self.buffer = []
+        self.buffer_size = 0
+        self.buffer_count = 0
+        # Append mode starts at the end of the file, so its position shows whether the feed already has content
+        self.file = open(self.file_path, 'a')
+        self.has_content = self.file.tell() > 0
+
+    def write(self, publication: Publication):
+        """Renders the publication into the buffer and flushes it when a threshold is reached."""
+        # Header goes before the first publication, two empty lines between publications
+        separator = "\n\n" if self.has_content else "News feed:\n"
+        formatted_publication = publication.format_publication()
+        self.buffer.append(separator)
+        self.buffer.append(formatted_publication)
+        self.has_content = True
+        self.buffer_size += len(separator) + len(formatted_publication)
+        self.buffer_count += 1
+        if self.buffer_size >= self.max_buffer_size or self.buffer_count >= self.max_count:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered publications to the file."""
+        if self.buffer:
+            self.file.writelines(self.buffer)
+            self.buffer.clear()
+            self.buffer_size = 0
+            self.buffer_count = 0
+        self.file.flush()
+
+    def close(self):
+        """Flushes buffered publications and closes the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class FileManager:
     """File manager class to handle saving publications to a text file."""
 
@@ -161,15 +189,14 @@ class FileManager:
             self.file_path = file_path
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
 
+    def open_writer(self, p_max_buffer_size: int = 1 << 20, p_max_count: int = 1000) -> FeedWriter:
+        """Opens a buffered writer to save many publications to the text file."""
+        return FeedWriter(self.file_path, p_max_buffer_size, p_max_count)
+
     def save_to_file(self, publication: Publication):
         """Saves a new publication to the text file."""
-        mode = 'a' if os.path.exists(self.file_path) and os.stat(self.file_path).st_size > 0 else 'w'
-        with open(self.file_path, mode) as f:
-            if mode == 'w':
-                f.write("News feed:\n")
-            else:
-                f.write("\n\n")  # Add two empty lines between publications
-            f.write(publication.format_publication())
+        with self.open_writer() as writer:
+            writer.write(publication)
 
     @staticmethod
     def read_file(p_file_path: str) -> str:
@@ -270,26 +297,28 @@ class FileInputPublication:
 
         processed_text = strings_func_4.capitalize_sentences(''.join(lines))  # Normalize using process_text()
 
-        for line in processed_text.split('\n'):
-            # Assuming each line has a structured format like: "News # Text # City #"
-            if line.startswith("News"):
-                title, inp_text, inp_city = (line.split('#') + [""] * 3)[:3]
-                text = self.publication.split_text([inp_text])
-                city = self.publication.split_text([inp_city])
-                news = News(text=text, city=city.strip())
-                self.file_manager.save_to_file(news)
-            elif line.startswith("Private ad"):
-                title, inp_text, expiration_date = (line.split('#') + [""] * 3)[:3]
-                text = self.publication.split_text([inp_text])
-                private_ad = \
-                    PrivateAd(text=text, expiration_date=expiration_date.strip())
-                self.file_manager.save_to_file(private_ad)
-            elif line.startswith("Joke"):
-                title, inp_text, inp_hashtag = (line.split('#') + [""] * 3)[:3]
-                text = self.publication.split_text([inp_text])
-                hashtag = self.publication.split_text([inp_hashtag])
-                joke = Joke(text=text, hashtag=hashtag.strip())
-                self.file_manager.save_to_file(joke)
+        # Keep the feed open and write publications in batches
+        with self.file_manager.open_writer() as writer:
+            for line in processed_text.split('\n'):
+                # Assuming each line has a structured format like: "News # Text # City #"
+                if line.startswith("News"):
+                    title, inp_text, inp_city = (line.split('#') + [""] * 3)[:3]
+                    text = self.publication.split_text([inp_text])
+                    city = self.publication.split_text([inp_city])
+                    news = News(text=text, city=city.strip())
+                    writer.write(news)
+                elif line.startswith("Private ad"):
+                    title, inp_text, expiration_date = (line.split('#') + [""] * 3)[:3]
+                    text = self.publication.split_text([inp_text])
+                    private_ad = \
+                        PrivateAd(text=text, expiration_date=expiration_date.strip())
+                    writer.write(private_ad)
+                elif line.startswith("Joke"):
+                    title, inp_text, inp_hashtag = (line.split('#') + [""] * 3)[:3]
+                    text = self.publication.split_text([inp_text])
+                    hashtag = self.publication.split_text([inp_hashtag])
+                    joke = Joke(text=text, hashtag=hashtag.strip())
+                    writer.write(joke)
 
         os.remove(self.input_file_path)  # Delete the file if successfully processed
 
@@ -17,9 +17,11 @@ HW: All publications will be saved in the publications.txt file that is stored i
     When entering any text, '#' symbol is used as the end of input indicator.
 """
 
+import locale
 import os
 from datetime import datetime
 import random
+import struct
 
 
 class Publication:
@@ -145,6 +147,55 @@ class Joke(Publication):
         return f"{base_format}{self.info_line}"
 
 
+class FeedWriter:
+    """Buffered writer keeping the feed file open and writing publications in batches."""
+
+    def __init__(self, p_file_path: str, p_max_buffer_size: int = 1 << 20, p_max_count: int = 1000):
+        self.file_path = p_file_path
+        self.max_buffer_size = p_max_buffer_size
+        self.max_count = p_max_count
+        self.buffer = []
+        self.buffer_size = 0
+        self.buffer_count = 0
+        # Append mode starts at the end of the file, so its position shows whether the feed already has content
+        self.file = open(self.file_path, 'a')
+        self.has_content = self.file.tell() > 0
+
+    def write(self, publication: Publication):
+        """Renders the publication into the buffer and flushes it when a threshold is reached."""
+        # Header goes before the first publication, two empty lines between publications
+        separator = "\n\n" if self.has_content else "News feed:\n"
+        formatted_publication = publication.format_publication()
+        self.buffer.append(separator)
+        self.buffer.append(formatted_publication)
+        self.has_content = True
+        self.buffer_size += len(separator) + len(formatted_publication)
+        self.buffer_count += 1
+        if self.buffer_size >= self.max_buffer_size or self.buffer_count >= self.max_count:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered publications to the file."""
+        if self.buffer:
+            self.file.writelines(self.buffer)
+            self.buffer.clear()
+            self.buffer_size = 0
+            self.buffer_count = 0
+        self.file.flush()
+
+    def close(self):
+        """Flushes buffered publications and closes the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class FileManager:
     """File manager class to handle saving publications to a text file."""
 
@@ -156,15 +207,14 @@ class FileManager:
             self.file_path = file_path
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
 
+    def open_writer(self, p_max_buffer_size: int = 1 << 20, p_max_count: int = 1000) -> FeedWriter:
+        """Opens a buffered writer to save many publications to the text file."""
+        return FeedWriter(self.file_path, p_max_buffer_size, p_max_count)
+
     def save_to_file(self, publication: Publication):
         """Saves a new publication to the text file."""
-        mode = 'a' if os.path.exists(self.file_path) and os.stat(self.file_path).st_size > 0 else 'w'
-        with open(self.file_path, mode) as f:
-            if mode == 'w':
-                f.write("News feed:\n")
-            else:
-                f.write("\n\n")  # Add two empty lines between publications
-            f.write(publication.format_publication())
+        with self.open_writer() as writer:
+            writer.write(publication)
 
     def read_file(self) -> str:
         """Reads the file and returns its content."""
@@ -173,6 +223,219 @@ class FileManager:
         with open(self.file_path, 'r') as f:
             return f.read()
 
+    def iter_publications(self, p_newest_first: bool = True, p_type: str = None, p_block_size: int = 1 << 16):
+        """Streams publications from the file by blocks, from the newest one by default.
+        Only publications of p_type are returned if it is given. Memory is bounded by the block size
+        and the longest publication."""
+        if not os.path.exists(self.file_path):
+            return
+        # The file is read as bytes to seek backwards, it was written in text mode with the default encoding,
+        # so line ends are os.linesep on disk (\r\n on Windows)
+        encoding = locale.getpreferredencoding(False)
+        header = f"News feed:{os.linesep}".encode(encoding)
+        separator = (os.linesep * 2).encode(encoding)
+        type_prefix = p_type.lower() if p_type else None
+
+        with open(self.file_path, 'rb') as f:
+            for data in (self.iter_parts_backward(f, separator, p_block_size) if p_newest_first
+                         else self.iter_parts_forward(f, separator, p_block_size)):
+                # The header is a part of the first publication
+                if data.startswith(header):
+                    data = data[len(header):]
+                if not data:
+                    continue
+                publication = data.decode(encoding).replace(os.linesep, '\n')
+                # Publication title is on the first line before dashes
+                if type_prefix is None or \
+                        publication.partition('\n')[0].rstrip('-').strip().lower() == type_prefix:
+                    yield publication
+
+    @staticmethod
+    def iter_parts_forward(f, p_separator: bytes, p_block_size: int):
+        """Yields parts of the file between separators from the beginning."""
+        tail = b''
+        while block := f.read(p_block_size):
+            parts = (tail + block).split(p_separator)
+            # The last part can continue in the next block
+            tail = parts.pop()
+            yield from parts
+        yield tail
+
+    @staticmethod
+    def iter_parts_backward(f, p_separator: bytes, p_block_size: int):
+        """Yields parts of the file between separators from the end."""
+        position = f.seek(0, os.SEEK_END)
+        head = b''
+        while position > 0:
+            read_size = min(p_block_size, position)
+            position -= read_size
+            f.seek(position)
+            parts = (f.read(read_size) + head).split(p_separator)
+            # The first part can start in the previous block
+            head = parts[0]
+            yield from reversed(parts[1:])
+        yield head
+
+    def iter_pages(self, p_page_size: int = 5, p_newest_first: bool = True, p_type: str = None):
+        """Groups streamed publications into pages of p_page_size publications."""
+        page = []
+        for publication in self.iter_publications(p_newest_first, p_type):
+            page.append(publication)
+            if len(page) == p_page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+class FeedStore:
+    """Feed store appending publications to size-capped segment files with an offset index for random access."""
+
+    # Index record: publication id, type code, date as YYYYMMDD, segment number, offset and length in the segment
+    index_record = struct.Struct('<IBIIQI')
+    type_codes = {"News": 1, "Private Ad": 2, "Joke": 3}
+    type_names = {code: name for name, code in type_codes.items()}
+
+    def __init__(self, p_store_dir: str, p_max_segment_size: int = 64 << 20):
+        self.store_dir = p_store_dir
+        self.max_segment_size = p_max_segment_size
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.index_path = os.path.join(self.store_dir, 'index.bin')
+        # Open segment files for reading by segment number
+        self.readers = {}
+
+        self.index_file = open(self.index_path, 'a+b')
+        index_size = self.index_file.seek(0, os.SEEK_END)
+        # Drop an incomplete record left by an interrupted append
+        if index_size % self.index_record.size:
+            index_size -= index_size % self.index_record.size
+            self.index_file.truncate(index_size)
+        self.count = index_size // self.index_record.size
+
+        # Continue the last segment
+        if self.count:
+            _, _, _, self.segment, offset, length = self.get_record(self.count)
+            self.segment_size = offset + length
+        else:
+            self.segment = 0
+            self.segment_size = 0
+        self.segment_file = open(self.get_segment_path(self.segment), 'ab')
+        # Data after the last indexed publication is not referenced, it is overwritten by the next append
+        self.segment_file.truncate(self.segment_size)
+
+    def get_segment_path(self, p_segment: int) -> str:
+        """Returns the path of the segment file."""
+        return os.path.join(self.store_dir, f'segment_{p_segment:05d}.txt')
+
+    def append(self, publication: Publication) -> int:
+        """Appends the publication to the current segment and returns its id."""
+        data = publication.format_publication().encode('utf-8')
+        # Start a new segment when the current one is full
+        if self.segment_size and self.segment_size + len(data) > self.max_segment_size:
+            self.segment_file.close()
+            self.segment += 1
+            self.segment_size = 0
+            self.segment_file = open(self.get_segment_path(self.segment), 'ab')
+
+        self.segment_file.write(data)
+        self.segment_file.flush()
+        # Index record is written after the data, so it never points to missing data
+        self.count += 1
+        self.index_file.write(self.index_record.pack(self.count, self.type_codes.get(publication.title, 0),
+                                                     int(publication.date.replace('/', '')), self.segment,
+                                                     self.segment_size, len(data)))
+        self.index_file.flush()
+        self.segment_size += len(data)
+        return self.count
+
+    def get_record(self, p_id: int) -> tuple:
+        """Returns the index record of the publication: (id, type, date, segment, offset, length)."""
+        return self.get_records(p_id, p_id)[0]
+
+    def get_records(self, p_first_id: int, p_last_id: int) -> list:
+        """Returns index records of publications from p_first_id to p_last_id with one read of the index."""
+        p_first_id = max(p_first_id, 1)
+        p_last_id = min(p_last_id, self.count)
+        if p_first_id > p_last_id:
+            return []
+        self.index_file.seek((p_first_id - 1) * self.index_record.size)
+        data = self.index_file.read((p_last_id - p_first_id + 1) * self.index_record.size)
+        return list(self.index_record.iter_unpack(data))
+
+    def read_segment(self, p_segment: int, p_offset: int, p_length: int) -> bytes:
+        """Reads bytes of the segment file."""
+        reader = self.readers.get(p_segment)
+        if reader is None:
+            reader = self.readers[p_segment] = open(self.get_segment_path(p_segment), 'rb')
+        reader.seek(p_offset)
+        return reader.read(p_length)
+
+    def get(self, p_id: int) -> str:
+        """Returns the formatted publication by its id, None if there is no such publication."""
+        if not 1 <= p_id <= self.count:
+            return None
+        _, _, _, segment, offset, length = self.get_record(p_id)
+        return self.read_segment(segment, offset, length).decode('utf-8')
+
+    def iter_range(self, p_first_id: int, p_last_id: int, p_type: str = None):
+        """Yields (id, type, date, publication) from p_first_id to p_last_id, optionally of the given type.
+        Publications of one segment are read with a single read."""
+        type_code = self.type_codes.get(p_type, 0) if p_type else None
+        records = self.get_records(p_first_id, p_last_id)
+        if type_code is not None:
+            records = [record for record in records if record[1] == type_code]
+
+        run_start = 0
+        while run_start < len(records):
+            # Group records of the same segment and read the bytes covering them at once
+            segment = records[run_start][3]
+            run_end = run_start
+            while run_end + 1 < len(records) and records[run_end + 1][3] == segment:
+                run_end += 1
+            base_offset = records[run_start][4]
+            data = self.read_segment(segment, base_offset, records[run_end][4] + records[run_end][5] - base_offset)
+            for publication_id, code, date, _, offset, length in records[run_start:run_end + 1]:
+                start = offset - base_offset
+                yield (publication_id, self.type_names.get(code, ''), f"{date // 10000:04d}/{date // 100 % 100:02d}/"
+                       f"{date % 100:02d}", data[start:start + length].decode('utf-8'))
+            run_start = run_end + 1
+
+    def last(self, p_count: int, p_type: str = None) -> list:
+        """Returns up to p_count last publications, optionally of the given type, from older to newer."""
+        if p_type is None:
+            return list(self.iter_range(self.count - p_count + 1, self.count))
+        # Scan the index backwards in blocks until enough publications of the type are found
+        result = []
+        last_id = self.count
+        block_size = max(p_count * 4, 1024)
+        while last_id > 0 and len(result) < p_count:
+            first_id = max(1, last_id - block_size + 1)
+            result = list(self.iter_range(first_id, last_id, p_type)) + result
+            last_id = first_id - 1
+        return result[-p_count:] if p_count > 0 else []
+
+    def export_legacy(self, p_file_path: str, p_chunk_count: int = 10000):
+        """Exports all publications to a text file in the publications.txt format."""
+        with open(p_file_path, 'w') as f:
+            for first_id in range(1, self.count + 1, p_chunk_count):
+                f.writelines(("News feed:\n" if publication_id == 1 else "\n\n") + publication
+                             for publication_id, _, _, publication
+                             in self.iter_range(first_id, first_id + p_chunk_count - 1))
+
+    def close(self):
+        """Closes segment and index files."""
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+        self.segment_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 def main():
     """Main function to handle user input and add publications to the file."""
@@ -218,7 +481,18 @@ def main():
             print("Joke has been added to the feed.")
 
         elif choice == '5':
-            print(fm.read_file())
+            if not os.path.exists(fm.file_path):
+                print("File not found")
+                continue
+            # Show the feed page by page starting from the newest publication
+            publication_type = input("Enter the type to show (News, Private Ad, Joke) or press Enter for all: ")
+            for page_number, page in enumerate(fm.iter_pages(p_type=publication_type.strip() or None), start=1):
+                print(f"\nPage {page_number}:\n")
+                print('\n\n'.join(page))
+                if input("\nPress Enter for the next page or 'q' to stop: ").strip().lower() == 'q':
+                    break
+            else:
+                print("\nEnd of the news feed.")
 
         else:
             print("Invalid choice. Please select a valid option.")
@@ -7,6 +7,8 @@ Expand previous Homework 5/6/7/8/9 with additional class, which allow to save re
 3.Implement “no duplicate” check.
 """
 
+import argparse
+import glob
 import os
 import random
 import sys
@@ -14,10 +16,20 @@ import csv
 from collections import Counter
 import re
 from datetime import datetime, timedelta
-from strings_func_4 import capitalize_sentences
+from strings_func_4 import capitalize_sentences_fast as capitalize_sentences, wrap_text
 import json
+from itertools import islice
+from typing import Iterator
 import xml.etree.ElementTree as ElementTree
 import sqlite3
+import hashlib
+import tempfile
+import time
+import filecmp
+import mmap
+import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 
 class Publication(object):
@@ -28,36 +40,20 @@ class Publication(object):
         self.text = text
         self.max_length: int = 50
         self.info_line = ''
+        self.text_wrapped = False
 
     def format_publication(self) -> str:
         """Returns the formatted string of the publication to be saved to the file."""
-        self.text = self.split_text(self.text if self.text else 'Here should be your text')
+        # Wrap the text only once, repeated calls reuse it
+        if not self.text_wrapped:
+            self.text = self.split_text(self.text if self.text else 'Here should be your text')
+            self.text_wrapped = True
         formatted_title = f"{self.title} {'-' * (self.max_length - len(self.title))}"
         return f"{formatted_title}\n{self.text}\n"
 
     def split_text(self, line: str) -> str:
         # Split into lines with max_length, keeping whole words intact
-        formatted_text = []
-
-        words = line.strip().split()  # Split each line into words
-        current_line = ""
-
-        for word in words:
-            # Check if adding the next word would exceed the max_length
-            if len(current_line) + len(word) + 1 > self.max_length:
-                formatted_text.append(current_line)  # Append the current line to the result
-                current_line = word  # Start a new line with the current word
-            else:
-                if current_line:
-                    current_line += " " + word  # Add the word to the current line with a space
-                else:
-                    current_line = word  # Start a new line if current_line is empty
-
-        if current_line:
-            formatted_text.append(current_line)  # Append any remaining words in current_line
-
-        # Join the formatted text with newline characters and return it as a single string
-        return '\n'.join(formatted_text)
+        return wrap_text(line, self.max_length)
 
 
 class News(Publication):
@@ -126,6 +122,43 @@ class FileManager:
             os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
 
         self.mode = 'a' if os.path.exists(self.file_path) and os.stat(self.file_path).st_size > 0 else 'w'
+        # Feed file kept open between save_publications() calls, see open()
+        self.file = None
+
+    def open(self):
+        """Keeps the feed file open for the following save_publications() calls until close()."""
+        if self.file is None:
+            self.file = open(self.file_path, self.mode)
+        return self
+
+    def flush(self):
+        """Writes saved publications of the open feed file to disk."""
+        if self.file is not None:
+            self.file.flush()
+
+    def checkpoint(self) -> tuple:
+        """Flushes the open feed file and returns its state to roll back to with rollback()."""
+        self.file.flush()
+        return self.file.tell(), self.mode
+
+    def rollback(self, p_checkpoint: tuple):
+        """Removes publications saved to the open feed file after the checkpoint."""
+        position, self.mode = p_checkpoint
+        self.file.flush()
+        self.file.truncate(position)
+        self.file.seek(position)  # Next write continues at the checkpoint, not after the removed text
+
+    def close(self):
+        """Closes the feed file opened by open()."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @staticmethod
     def validate_file_path(p_file_path: str, p_file_extension: str):
@@ -141,21 +174,45 @@ class FileManager:
     def save_publications(self, p_publication_list: list[Publication]):
         """Saves a new publication to the text file."""
 
-        with open(self.file_path, self.mode) as f:
-            if self.mode == 'w':
-                f.write("News feed:")
+        if self.file is not None:
+            self.write_publications(self.file, p_publication_list)
+        else:
+            with open(self.file_path, self.mode) as f:
+                self.write_publications(f, p_publication_list)
+
+    def write_publications(self, p_file, p_publication_list: list[Publication]):
+        """Writes publications to the open feed file, with the header if the feed is new."""
+        if self.mode == 'w':
+            p_file.write("News feed:")
+
+        for publication in p_publication_list:
+            p_file.write("\n\n")
+            p_file.write(publication.format_publication())
 
-            for publication in p_publication_list:
-                f.write("\n\n")
-                f.write(publication.format_publication())
+        self.mode = 'a'  # Next batches are appended after the header
 
     @staticmethod
-    def read_txt_file(p_file_path: str) -> list[dict]:
+    def read_txt_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per line."""
 
         FileManager.validate_file_path(p_file_path, '.txt')
+        return FileManager.iter_txt_publications(p_file_path)
+
+    @staticmethod
+    def iter_file_publications(p_file_path: str) -> Iterator[dict]:
+        """Returns a generator of publications of TXT, JSON or XML file chosen by the file extension."""
+        readers = {'.txt': FileManager.iter_txt_publications,
+                   '.json': FileManager.iter_json_publications,
+                   '.xml': FileManager.iter_xml_publications}
+        extension = os.path.splitext(p_file_path)[1].lower()
+        if extension not in readers:
+            raise ValueError(f"Unsupported file format '{extension}'")
+        return readers[extension](p_file_path)
+
+    @staticmethod
+    def iter_txt_publications(p_file_path: str) -> Iterator[dict]:
 
         try:
-            publications = []
             with open(p_file_path, 'r', encoding='utf-8') as file:
                 for line in file:
                     title, text, info_line = (line.split('#') + [""] * 3)[:3]
@@ -171,55 +228,397 @@ class FileManager:
                     elif title == "Joke":
                         publication["Hashtag"] = info_line
 
-                    publications.append(publication)
-            return publications
+                    yield publication
 
         except ValueError:
             raise ValueError(f"TXT file '{p_file_path}' has an incorrect file structure")
 
     @staticmethod
-    def read_json_file(p_file_path: str) -> list[dict]:
+    def read_json_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per JSON array element."""
 
         FileManager.validate_file_path(p_file_path, '.json')
+        return FileManager.iter_json_publications(p_file_path)
+
+    @staticmethod
+    def iter_json_publications(p_file_path: str, p_chunk_size: int = 65536) -> Iterator[dict]:
+        """Parses the top-level JSON array incrementally, keeping only the not yet parsed part in memory."""
+        decoder = json.JSONDecoder()
 
         try:
             with open(p_file_path, 'r', encoding='utf-8') as file:
-                publications = json.load(file)
+                buffer = ''
+                position = 0
+                end_of_file = False
+                array_started = False
+                expect_separator = False
+                value_required = False
 
-            return publications
+                while True:
+                    # Skip whitespace between tokens
+                    while position < len(buffer) and buffer[position].isspace():
+                        position += 1
+
+                    if position == len(buffer):
+                        if end_of_file:
+                            raise ValueError("Unexpected end of JSON array")
+                        buffer, position = file.read(p_chunk_size), 0
+                        end_of_file = not buffer
+                        continue
+
+                    char = buffer[position]
+                    if not array_started:
+                        if char != '[':
+                            raise ValueError("JSON file should contain an array of publications")
+                        array_started = True
+                        position += 1
+                    elif char == ']':
+                        if value_required:
+                            raise ValueError("Expected a value after ',' in JSON array")
+                        # Only whitespace may follow the array
+                        rest = buffer[position + 1:]
+                        while rest.isspace() or not rest:
+                            rest = file.read(p_chunk_size)
+                            if not rest:
+                                return
+                        raise ValueError("Unexpected data after JSON array")
+                    elif expect_separator:
+                        if char != ',':
+                            raise ValueError("Expected ',' between JSON array elements")
+                        expect_separator = False
+                        value_required = True
+                        position += 1
+                    else:
+                        try:
+                            publication, end = decoder.raw_decode(buffer, position)
+                        except json.JSONDecodeError:
+                            if end_of_file:
+                                raise
+                            end = len(buffer)  # Element is not complete yet
+
+                        if end == len(buffer) and not end_of_file:
+                            # Element may continue in the next chunk; read size grows with the buffer
+                            more_text = file.read(max(p_chunk_size, len(buffer) - position))
+                            end_of_file = not more_text
+                            buffer, position = buffer[position:] + more_text, 0
+                            continue
+
+                        if not isinstance(publication, dict):
+                            raise ValueError("JSON array elements should be publication objects")
+                        expect_separator = True
+                        value_required = False
+                        position = end
+                        yield publication
 
         except ValueError:
             raise ValueError(f"JSON file '{p_file_path}' has an incorrect file structure")
 
     @staticmethod
-    def read_xml_file(p_file_path: str) -> list[dict]:
+    def read_xml_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per Publication element."""
 
         FileManager.validate_file_path(p_file_path, '.xml')
+        return FileManager.iter_xml_publications(p_file_path)
+
+    @staticmethod
+    def iter_xml_publications(p_file_path: str) -> Iterator[dict]:
+        """Parses XML with iterparse and clears processed elements, so the tree never grows past one record."""
 
         try:
-            publications = []
-            tree = ElementTree.parse(p_file_path)
-            root = tree.getroot()
+            context = ElementTree.iterparse(p_file_path, events=('start', 'end'))
+            _, root = next(context)
 
-            for record in root.findall('Publication'):
-                record_dict = {}
-                for elem in record:
-                    record_dict[elem.tag] = elem.text
+            for event, elem in context:
+                if event == 'end' and elem.tag == 'Publication':
+                    record_dict = {}
+                    for child in elem:
+                        record_dict[child.tag] = child.text
 
-                publications.append(record_dict)
-            return publications
+                    yield record_dict
+                    root.clear()  # Drop processed records
 
         except ValueError:
             raise ValueError(f"XML file '{p_file_path}' has an incorrect file structure")
 
 
+def count_file_range(p_file_path: str, p_start: int, p_end: int, p_chunk_size: int) -> tuple[Counter, Counter]:
+    """Counts raw whitespace-separated tokens and characters in the byte range of the file.
+    The range has to start and end on line boundaries, so UTF-8 characters and words are never split.
+    """
+    token_counter = Counter()
+    char_counter = Counter()
+
+    with open(p_file_path, 'rb') as file:
+        file.seek(p_start)
+        position = p_start
+        while position < p_end:
+            chunk = file.read(min(p_chunk_size, p_end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            if position < p_end:
+                chunk += file.readline()  # Finish the current line
+                position = file.tell()
+            chunk = chunk.decode('utf-8')
+            token_counter.update(chunk.split())
+            char_counter.update(chunk)
+
+    return token_counter, char_counter
+
+
 class PublicationCSVProcessor:
     """Class to process publications.txt file and generate two CSV files based on word and letter statistics."""
 
-    def __init__(self, p_publication_file: str, p_words_csv_file: str, p_letters_csv_file: str):
+    def __init__(self, p_publication_file: str, p_words_csv_file: str, p_letters_csv_file: str,
+                 p_state_file: str = None):
         self.publication_file = p_publication_file
         self.words_csv_file = p_words_csv_file
         self.letters_csv_file = p_letters_csv_file
+        # Raw counters and checkpoint of publications.txt saved by process_incremental()
+        self.state_file = p_state_file if p_state_file else \
+            os.path.join(os.path.dirname(p_words_csv_file), 'statistics_state.json')
+        self.read_chunk_size = 1024 * 1024  # Approximate size of text read at once by process_all()
+        self.fingerprint_size = 4096  # Bytes hashed at the start and before the checkpoint to detect rewrites
+        self.ascii_letter_bytes = string.ascii_letters.encode('ascii')
+        self.non_letter_bytes = bytes(value for value in range(256) if value not in self.ascii_letter_bytes)
+        self.word_strip_pattern = re.compile(r'^[^a-zA-Z0-9]+|[^a-zA-Z0-9]+$')
+
+    def process_all(self):
+        """Creates both CSV files with word and letter statistics from a single read of publications.txt.
+        Raw tokens and characters are counted on whole chunks by Counter.update, so cleaning, lower-casing
+        and letter checks run once per distinct token or character instead of once per occurrence.
+        """
+        if not os.path.exists(self.publication_file):
+            print("Publication file not found!")
+            return
+
+        token_counter = Counter()
+        char_counter = Counter()
+
+        with open(self.publication_file, 'r', encoding='utf-8') as file:
+            while lines := file.readlines(self.read_chunk_size):
+                chunk = ''.join(lines)
+                token_counter.update(chunk.split())
+                char_counter.update(chunk)
+
+        self.write_words_csv(self.count_words(token_counter))
+        self.write_letters_csv(*self.count_letters(char_counter))
+
+    def process_parallel(self, p_workers: int = None):
+        """Creates both CSV files counting line-aligned byte ranges of publications.txt in worker processes.
+        Partial counters are merged pairwise in range order, so the result is identical to process_all().
+        """
+        if not os.path.exists(self.publication_file):
+            print("Publication file not found!")
+            return
+
+        workers = p_workers if p_workers else os.cpu_count() or 1
+        ranges = self.split_file_ranges(workers)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partial_counters = list(executor.map(count_file_range, [self.publication_file] * len(ranges),
+                                                 [start for start, _ in ranges], [end for _, end in ranges],
+                                                 [self.read_chunk_size] * len(ranges)))
+
+        # Tree reduction: merge neighbouring results until one pair of counters is left
+        while len(partial_counters) > 1:
+            merged_counters = []
+            for i in range(0, len(partial_counters) - 1, 2):
+                (left_tokens, left_chars), (right_tokens, right_chars) = partial_counters[i], partial_counters[i + 1]
+                left_tokens.update(right_tokens)
+                left_chars.update(right_chars)
+                merged_counters.append((left_tokens, left_chars))
+            if len(partial_counters) % 2:
+                merged_counters.append(partial_counters[-1])
+            partial_counters = merged_counters
+
+        token_counter, char_counter = partial_counters[0] if partial_counters else (Counter(), Counter())
+        self.write_words_csv(self.count_words(token_counter))
+        self.write_letters_csv(*self.count_letters(char_counter))
+
+    def split_file_ranges(self, p_parts: int) -> list[tuple[int, int]]:
+        """Splits publications.txt into up to p_parts byte ranges, moving each boundary to the next line start."""
+        file_size = os.path.getsize(self.publication_file)
+        boundaries = [0]
+
+        with open(self.publication_file, 'rb') as file:
+            for part in range(1, p_parts):
+                file.seek(max(file_size * part // p_parts, boundaries[-1]))
+                file.readline()  # Move to the start of the next line
+                boundary = file.tell()
+                if boundary >= file_size:
+                    break
+                if boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+        boundaries.append(file_size)
+
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+    def process_letters_mmap(self):
+        """Creates the letters CSV file scanning memory-mapped publications.txt with byte operations.
+        ASCII-only chunks are counted with bytes.translate and bytes.count without decoding,
+        chunks with other characters are decoded and counted as text. Result is identical to process_letters().
+        """
+        if not os.path.exists(self.publication_file):
+            print("Publication file not found!")
+            return
+
+        char_counter = Counter()
+
+        with open(self.publication_file, 'rb') as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if file_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                    start = 0
+                    while start < file_size:
+                        # Chunks end after a line break, so UTF-8 characters are never split
+                        end = mapped_file.find(b'\n', min(start + self.read_chunk_size, file_size))
+                        end = file_size if end == -1 else end + 1
+                        chunk = mapped_file[start:end]
+                        start = end
+
+                        if chunk.isascii():
+                            self.count_ascii_letters(chunk, char_counter)
+                        else:
+                            char_counter.update(chunk.decode('utf-8'))
+
+        self.write_letters_csv(*self.count_letters(char_counter))
+
+    def count_ascii_letters(self, p_chunk: bytes, p_char_counter: Counter):
+        """Adds ASCII letter counts of the chunk to the counter, keeping new letters in order of first occurrence."""
+        letters_only = p_chunk.translate(None, self.non_letter_bytes)
+        chunk_counts = []
+
+        for byte_value in self.ascii_letter_bytes:
+            count = letters_only.count(byte_value)
+            if count:
+                chunk_counts.append((letters_only.find(byte_value), chr(byte_value), count))
+
+        for _, char, count in sorted(chunk_counts):
+            p_char_counter[char] += count
+
+    def process_incremental(self):
+        """Creates both CSV files counting only the part of publications.txt appended since the previous run.
+        Raw counters are stored in the state file together with the offset of the last complete line.
+        If the file was truncated or rewritten before that offset, statistics are rebuilt from scratch.
+        """
+        if not os.path.exists(self.publication_file):
+            print("Publication file not found!")
+            return
+
+        state = self.load_state()
+        token_counter = Counter()
+        char_counter = Counter()
+        offset = 0
+        tail_line = b''
+
+        with open(self.publication_file, 'rb') as file:
+            if state and self.file_fingerprint(file, state['offset']) == state['fingerprint']:
+                token_counter.update(state['tokens'])
+                char_counter.update(state['chars'])
+                offset = state['offset']
+            else:
+                print("Statistics checkpoint is missing or outdated, rebuilding statistics.")
+
+            file.seek(offset)
+            while lines := file.readlines(self.read_chunk_size):
+                if not lines[-1].endswith(b'\n'):
+                    tail_line = lines.pop()  # Line without '\n' can be continued by the next append
+                chunk = b''.join(lines)
+                offset += len(chunk)
+                chunk = chunk.decode('utf-8')
+                token_counter.update(chunk.split())
+                char_counter.update(chunk)
+
+            fingerprint = self.file_fingerprint(file, offset)
+
+        self.save_state({'offset': offset, 'fingerprint': fingerprint,
+                         'tokens': token_counter, 'chars': char_counter})
+
+        # Unfinished last line is counted in CSV files but not saved in the checkpoint
+        tail_text = tail_line.decode('utf-8')
+        token_counter.update(tail_text.split())
+        char_counter.update(tail_text)
+
+        self.write_words_csv(self.count_words(token_counter))
+        self.write_letters_csv(*self.count_letters(char_counter))
+
+    def file_fingerprint(self, p_file, p_offset: int) -> str:
+        """Returns hash of the file start and of the bytes before the offset, or '' if the file is shorter."""
+        p_file.seek(0, os.SEEK_END)
+        if p_file.tell() < p_offset:
+            return ''  # File was truncated
+
+        p_file.seek(0)
+        head_bytes = p_file.read(min(self.fingerprint_size, p_offset))
+        tail_start = max(0, p_offset - self.fingerprint_size)
+        p_file.seek(tail_start)
+        tail_bytes = p_file.read(p_offset - tail_start)
+        return hashlib.sha256(head_bytes + b'\x00' + tail_bytes).hexdigest()
+
+    def load_state(self) -> dict | None:
+        """Loads saved counters and checkpoint, returns None if there is no valid state file."""
+        if not os.path.exists(self.state_file):
+            return None
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if {'offset', 'fingerprint', 'tokens', 'chars'} - state.keys():
+                return None
+            return state
+        except ValueError:
+            return None
+
+    def save_state(self, p_state: dict):
+        """Saves counters and checkpoint to the state file, replacing it atomically."""
+        tmp_state_file = self.state_file + '.tmp'
+        with open(tmp_state_file, 'w', encoding='utf-8') as f:
+            json.dump(p_state, f, ensure_ascii=False)
+        os.replace(tmp_state_file, self.state_file)
+
+    def count_words(self, p_token_counter: Counter) -> Counter:
+        """Converts raw whitespace-separated token counts into cleaned lower-case word counts."""
+        word_counter = Counter()
+
+        # Tokens are in order of first occurrence, so words keep the same order as in process_words()
+        for token, count in p_token_counter.items():
+            cleaned_word = self.word_strip_pattern.sub('', token)
+            if any(char.isalpha() for char in cleaned_word):
+                word_counter[cleaned_word.lower()] += count
+
+        return word_counter
+
+    @staticmethod
+    def count_letters(p_char_counter: Counter) -> tuple[Counter, Counter]:
+        """Converts raw character counts into case-insensitive letter counts and upper-case letter counts."""
+        letter_counter = Counter()
+        upper_counter = Counter()
+
+        for char, count in p_char_counter.items():
+            if char.isalpha():
+                letter_counter[char.lower()] += count
+                if char.isupper():
+                    upper_counter[char.lower()] += count
+
+        return letter_counter, upper_counter
+
+    def write_words_csv(self, p_word_counter: Counter):
+        """Writes word counts to the words CSV file."""
+        with open(self.words_csv_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Word', 'Quantity'])
+            writer.writerows(p_word_counter.items())
+
+    def write_letters_csv(self, p_letter_counter: Counter, p_upper_counter: Counter):
+        """Writes letter counts and upper-case percentage to the letters CSV file."""
+        with open(self.letters_csv_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Letter/Digit', 'Count_all', 'Count_Upper', 'Percentage'])
+
+            for char, count_all in p_letter_counter.items():
+                count_upper = p_upper_counter[char]
+                percentage = (count_upper / count_all * 100) if count_all > 0 else 0
+                writer.writerow([char, count_all, count_upper, round(percentage, 2)])
 
     def process_words(self):
         """Processes words in publications.txt and creates a CSV file with word counts."""
@@ -283,6 +682,42 @@ class PublicationCSVProcessor:
                 writer.writerow([char, count_all, count_upper, round(percentage, 2)])
 
 
+class FieldNormalizer:
+    """Normalizes letter case of publication fields with capitalize_sentences().
+    Short values (types, cities, hashtags, dates) are repeated in many records, so their results are memoized
+    in a bounded LRU cache. Keys are normalized once per input schema (tuple of record keys).
+    """
+
+    def __init__(self, p_cache_size: int = 10000, p_max_cached_length: int = 64):
+        self.max_cached_length = p_max_cached_length
+        self.cached_capitalize = lru_cache(maxsize=p_cache_size)(capitalize_sentences)
+        self.key_maps = {}  # Tuple of record keys -> tuple of normalized keys
+
+    def normalize_value(self, p_value: str) -> str:
+        """Normalizes one value, using the cache for short values."""
+        if len(p_value) <= self.max_cached_length:
+            return self.cached_capitalize(p_value)
+        return capitalize_sentences(p_value)
+
+    def normalize_record(self, p_record: dict) -> dict:
+        """Returns a new record with normalized keys and values converted to strings."""
+        record_keys = tuple(p_record)
+        normalized_keys = self.key_maps.get(record_keys)
+        if normalized_keys is None:
+            normalized_keys = tuple(capitalize_sentences(str(key)) for key in record_keys)
+            self.key_maps[record_keys] = normalized_keys
+
+        normalize_value = self.normalize_value
+        return dict(zip(normalized_keys, [normalize_value(str(value)) for value in p_record.values()]))
+
+    def cache_info(self) -> dict:
+        """Returns hits, misses and hit rate of the values cache and the number of known schemas."""
+        info = self.cached_capitalize.cache_info()
+        requests_count = info.hits + info.misses
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'schemas': len(self.key_maps),
+                'hit_rate': info.hits / requests_count if requests_count else 0.0}
+
+
 class ConsoleInputPublication:
     """Processes publication information entered by the user via the console."""
 
@@ -356,10 +791,17 @@ class PublicationSQLProcessor:
         self.news_table = 'news_table'
         self.ad_table = 'ad_table'
         self.joke_table = 'joke_table'
+        # Publication type -> (table name, columns, number of leading columns hashed for the "no duplicate" check)
+        self.table_scripts = {
+            "News": ('news_table', ('Type', 'Text', 'City', 'Date', 'Time'), 3),
+            "Private_ad": ('private_ad', ('Type', 'Text', 'Expiration_date'), 3),
+            "Joke": ('joke_table', ('Type', 'Text', 'Hashtag'), 3),
+        }
         # Persistent connection and cursor
         self.connection = sqlite3.connect(self.db_name)
         self.cursor = self.connection.cursor()
         self.create_tables()  # Initialize tables on startup
+        self.migrate_content_hash()  # Backfill hashes and unique indexes for older DB files
 
     def create_tables(self):
         """Creates necessary tables if they do not exist."""
@@ -369,21 +811,24 @@ class PublicationSQLProcessor:
                 text TEXT,
                 city TEXT,
                 date TEXT,
-                time TEXT
+                time TEXT,
+                content_hash TEXT
             )
         """
         ad_tbl_create_script = """
             CREATE TABLE IF NOT EXISTS private_ad (
                 type TEXT,
                 text TEXT,
-                expiration_date TEXT
+                expiration_date TEXT,
+                content_hash TEXT
             )
         """
         joke_tbl_create_script = """
             CREATE TABLE IF NOT EXISTS joke_table (
                 type TEXT,
                 text TEXT,
-                hashtag TEXT
+                hashtag TEXT,
+                content_hash TEXT
             )
         """
         # Creating tables
@@ -392,6 +837,56 @@ class PublicationSQLProcessor:
         self.cursor.execute(joke_tbl_create_script)
         self.connection.commit()  # Commit table creation
 
+    @staticmethod
+    def content_hash(p_key_values: tuple) -> str:
+        """Returns the hash of the "no duplicate" key values (Type, Text and City/Expiration_date/Hashtag)."""
+        key_text = '\x1f'.join('' if value is None else str(value) for value in p_key_values)
+        return hashlib.sha256(key_text.encode('utf-8')).hexdigest()
+
+    def migrate_content_hash(self):
+        """Adds content_hash column to tables created by older versions, backfills it and creates unique indexes.
+        Rows that duplicate an earlier row by hash are removed, as the unique index can't be built over them.
+        """
+        for table_name, columns, key_size in self.table_scripts.values():
+            self.cursor.execute(f"PRAGMA table_info({table_name})")
+            if 'content_hash' not in [column_info[1] for column_info in self.cursor.fetchall()]:
+                self.cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN content_hash TEXT")
+
+            # Existing hashes are loaded only if some rows have to be backfilled
+            self.cursor.execute(f"SELECT 1 FROM {table_name} WHERE content_hash IS NULL LIMIT 1")
+            if self.cursor.fetchone() is None:
+                with self.connection:
+                    self.connection.execute(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_content_hash_idx "
+                        f"ON {table_name} (content_hash)")
+                continue
+
+            self.cursor.execute(f"SELECT content_hash FROM {table_name} WHERE content_hash IS NOT NULL")
+            seen_hashes = {row[0] for row in self.cursor.fetchall()}
+            self.cursor.execute(
+                f"SELECT rowid, {', '.join(columns[:key_size])} FROM {table_name} "
+                f"WHERE content_hash IS NULL ORDER BY rowid")
+
+            hash_updates = []
+            duplicate_rows = []
+            for row in self.cursor.fetchall():
+                row_hash = self.content_hash(row[1:])
+                if row_hash in seen_hashes:
+                    duplicate_rows.append((row[0],))
+                else:
+                    seen_hashes.add(row_hash)
+                    hash_updates.append((row_hash, row[0]))
+
+            with self.connection:
+                self.connection.executemany(f"DELETE FROM {table_name} WHERE rowid = ?", duplicate_rows)
+                self.connection.executemany(
+                    f"UPDATE {table_name} SET content_hash = ? WHERE rowid = ?", hash_updates)
+                self.connection.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_content_hash_idx "
+                    f"ON {table_name} (content_hash)")
+            print(f"{table_name}: content_hash backfilled for {len(hash_updates)} rows, "
+                  f"{len(duplicate_rows)} duplicate rows removed")
+
     def script_executor(self, p_script_text: str, params: tuple = ()):
         """Executes given SQL script with provided parameters."""
         try:
@@ -400,60 +895,64 @@ class PublicationSQLProcessor:
         except sqlite3.Error as e:
             raise sqlite3.Error(f"Database error: {e}")
 
-    def save_publications_db(self, publications_list: list[dict]):
-        """Saves each publication in the list to the appropriate table in the database."""
+    def save_publications_bulk(self, publications_list: list[dict], p_chunk_size: int = 0) -> dict:
+        """Saves publications grouped by type with one executemany per table.
+        Duplicates are skipped by INSERT OR IGNORE on the unique content_hash index.
+        All rows are written in one transaction, or in transactions of p_chunk_size rows if it is set.
+        Returns the number of inserted and skipped rows per table, records with a missing or unknown Type
+        are counted as skipped under 'unknown_type'.
+        """
+        insert_batches = {}
+        report = {}
+        for table_name, columns, key_size in self.table_scripts.values():
+            insert_script = f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}, content_hash) " \
+                            f"VALUES ({', '.join('?' * (len(columns) + 1))})"
+            insert_batches[table_name] = (insert_script, [])
+            report[table_name] = {'inserted': 0, 'skipped': 0}
+
+        # Group records by type, keeping only the columns of the target table
         for publication_item in publications_list:
             title = publication_item.get('Type', '')
+            if title not in self.table_scripts:
+                # Records without a known type are reported as skipped, not written to any table
+                report.setdefault('unknown_type', {'inserted': 0, 'skipped': 0})['skipped'] += 1
+                continue
+            table_name, columns, key_size = self.table_scripts[title]
+            row = tuple(publication_item.get(column) for column in columns)
+            insert_batches[table_name][1].append(row + (self.content_hash(row[:key_size]),))
 
-            match title:
-                case "News":
-                    self.cursor.execute(""" SELECT 1 FROM news_table WHERE Type=? AND Text=? AND City=?
-                    """, (
-                        publication_item['Type'],
-                        publication_item['Text'],
-                        publication_item['City']
-                        ))
-                    if not self.cursor.fetchone():
-                        self.script_executor(""" 
-                            INSERT INTO news_table (type, text, city, date, time) VALUES (?,?,?,?,?)
-                            """, (
-                            publication_item['Type'],
-                            publication_item['Text'],
-                            publication_item['City'],
-                            publication_item['Date'],
-                            publication_item['Time']
-                        ))
-                case "Private_ad":
-                    self.cursor.execute(""" SELECT 1 FROM private_ad WHERE Type=? AND Text=? AND Expiration_date=?
-                    """, (
-                        publication_item['Type'],
-                        publication_item['Text'],
-                        publication_item['Expiration_date']
-                        ))
-                    if not self.cursor.fetchone():
-                        self.script_executor("""
-                            INSERT OR IGNORE INTO private_ad (type, text, expiration_date) 
-                            VALUES (?, ?, ?)
-                            """, (
-                            publication_item['Type'],
-                            publication_item['Text'],
-                            publication_item['Expiration_date']
-                        ))
-                case "Joke":
-                    self.cursor.execute(""" SELECT 1 FROM joke_table WHERE Type=? AND Text=? AND hashtag=?
-                        """, (
-                        publication_item['Type'],
-                        publication_item['Text'],
-                        publication_item['Hashtag']
-                    ))
-                    if not self.cursor.fetchone():
-                        self.script_executor(""" INSERT OR IGNORE INTO joke_table (type, text, hashtag) VALUES (?,?,?)
-                            """, (
-                            publication_item['Type'],
-                            publication_item['Text'],
-                            publication_item['Hashtag']
-                        ))
+        try:
+            if p_chunk_size > 0:
+                # One transaction per chunk of rows
+                for table_name, (insert_script, rows) in insert_batches.items():
+                    for chunk_start in range(0, len(rows), p_chunk_size):
+                        chunk = rows[chunk_start:chunk_start + p_chunk_size]
+                        with self.connection:
+                            inserted = self.connection.executemany(insert_script, chunk).rowcount
+                        report[table_name]['inserted'] += inserted
+                        report[table_name]['skipped'] += len(chunk) - inserted
+            else:
+                # One transaction for the whole batch
+                with self.connection:
+                    for table_name, (insert_script, rows) in insert_batches.items():
+                        if rows:
+                            inserted = self.connection.executemany(insert_script, rows).rowcount
+                            report[table_name]['inserted'] += inserted
+                            report[table_name]['skipped'] += len(rows) - inserted
+        except sqlite3.Error as e:
+            raise sqlite3.Error(f"Database error: {e}")
 
+        return report
+
+    def save_publications_db(self, publications_list: list[dict]):
+        """Saves each publication in the list to the appropriate table in the database."""
+        report = self.save_publications_bulk(publications_list)
+        for table_name, counts in report.items():
+            print(f"{table_name}: {counts['inserted']} inserted, {counts['skipped']} skipped")
+        self.print_records()
+
+    def print_records(self):
+        """Prints records of all publication tables."""
         print(f'Data base tables records:\n')
         self.cursor.execute("select * from news_table")
         news_records = self.cursor.fetchall()
@@ -470,8 +969,190 @@ class PublicationSQLProcessor:
         self.connection.close()
 
 
+def benchmark_statistics(p_feed_size_mb: float = 1024, p_seed: int = 1):
+    """Compares process_words() + process_letters() with process_all() and process_parallel()
+    on a generated feed of given size.
+    """
+    generator = random.Random(p_seed)
+    vocabulary = ["News", "city", "Private_ad", "JOKE", "great", "doctor?", "(virus!)", "2024/12/01", "brand-new",
+                  "café", "Österreich", "x2", "--", "#FunnyJoke", "it's", "...", "Hello,", "WORLD."]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        feed_file = os.path.join(tmp_dir, 'publications.txt')
+        with open(feed_file, 'w', encoding='utf-8') as f:
+            written = 0
+            while written < p_feed_size_mb * 1024 * 1024:
+                line = ' '.join(generator.choices(vocabulary, k=12)) + '\n'
+                written += f.write(line * 1000)
+
+        legacy = PublicationCSVProcessor(feed_file, os.path.join(tmp_dir, 'words_legacy.csv'),
+                                         os.path.join(tmp_dir, 'letters_legacy.csv'))
+        single_pass = PublicationCSVProcessor(feed_file, os.path.join(tmp_dir, 'words.csv'),
+                                              os.path.join(tmp_dir, 'letters.csv'))
+
+        start = time.perf_counter()
+        legacy.process_words()
+        legacy.process_letters()
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single_pass.process_all()
+        single_pass_time = time.perf_counter() - start
+
+        identical = filecmp.cmp(legacy.words_csv_file, single_pass.words_csv_file, shallow=False) and \
+            filecmp.cmp(legacy.letters_csv_file, single_pass.letters_csv_file, shallow=False)
+
+        start = time.perf_counter()
+        single_pass.process_parallel()
+        parallel_time = time.perf_counter() - start
+
+        identical = identical and \
+            filecmp.cmp(legacy.words_csv_file, single_pass.words_csv_file, shallow=False) and \
+            filecmp.cmp(legacy.letters_csv_file, single_pass.letters_csv_file, shallow=False)
+
+    print(f"Feed size: {p_feed_size_mb} MB")
+    print(f"process_words + process_letters: {legacy_time:.2f} s")
+    print(f"process_all: {single_pass_time:.2f} s ({legacy_time / single_pass_time:.1f}x faster)")
+    print(f"process_parallel ({os.cpu_count()} workers): {parallel_time:.2f} s "
+          f"({legacy_time / parallel_time:.1f}x faster)")
+    print(f"Identical CSV files: {identical}")
+
+
+def ingest_publications(p_publication_texts, p_file_manager: FileManager, p_sql_processor: PublicationSQLProcessor,
+                        p_normalizer: FieldNormalizer, p_db_report: dict, p_batch_size: int = 1000) -> int:
+    """Normalizes publications and saves them to the feed file and the DB in batches.
+    Inserted and skipped rows are added to p_db_report per table. Returns the number of processed records.
+    """
+    publication_texts = iter(p_publication_texts)
+    records_count = 0
+
+    # Records are read, normalized and saved in batches, so the whole input is never held in memory
+    while publication_batch := list(islice(publication_texts, p_batch_size)):
+        publication_texts_updated = [p_normalizer.normalize_record(d) for d in publication_batch]
+
+        publications_list = []
+        for publication_item in publication_texts_updated:
+            match publication_item["Type"]:
+                case "News":
+                    publications_list.append(News(publication_item))
+                case "Private_ad":
+                    publications_list.append(PrivateAd(publication_item))
+                case "Joke":
+                    publications_list.append(Joke(publication_item))
+        p_file_manager.save_publications(publications_list)
+
+        batch_report = p_sql_processor.save_publications_bulk(publication_texts_updated)
+        for table_name, counts in batch_report.items():
+            table_report = p_db_report.setdefault(table_name, {'inserted': 0, 'skipped': 0})
+            table_report['inserted'] += counts['inserted']
+            table_report['skipped'] += counts['skipped']
+        records_count += len(publication_batch)
+
+    return records_count
+
+
+def print_ingest_report(p_db_report: dict, p_normalizer: FieldNormalizer):
+    """Prints inserted and skipped rows per table and the normalization cache hit rate."""
+    for table_name, counts in p_db_report.items():
+        print(f"{table_name}: {counts['inserted']} inserted, {counts['skipped']} skipped")
+    normalizer_info = p_normalizer.cache_info()
+    print(f"Normalization cache: {normalizer_info['hits']} hits, {normalizer_info['misses']} misses "
+          f"({normalizer_info['hit_rate']:.0%} hit rate)")
+
+
+def find_input_files(p_input: str, p_excluded_files: list[str]) -> list[str]:
+    """Returns TXT, JSON and XML files of the directory or matching the glob pattern, sorted by name."""
+    if os.path.isdir(p_input):
+        candidates = [os.path.join(p_input, file_name) for file_name in os.listdir(p_input)]
+    else:
+        candidates = glob.glob(p_input)
+    excluded_files = {os.path.abspath(file_path) for file_path in p_excluded_files}
+
+    return sorted(file_path for file_path in candidates
+                  if os.path.splitext(file_path)[1].lower() in ('.txt', '.json', '.xml')
+                  and os.path.isfile(file_path) and os.path.abspath(file_path) not in excluded_files)
+
+
+def run_batch(p_args: argparse.Namespace):
+    """Processes all TXT, JSON and XML files of a directory or glob pattern without prompts.
+    One DB connection and one open feed file are used for the whole run, statistics are counted once at the end.
+    Each file is deleted only after all its publications are committed. A failed file is reported and kept
+    for the next run: its publications are removed from the feed, and its already committed rows are skipped
+    then by the "no duplicate" check.
+    """
+    feed_file = os.path.abspath(p_args.feed)
+    feed_dir = os.path.dirname(feed_file)
+    words_csv_file = os.path.join(feed_dir, 'words_count.csv')
+    letters_csv_file = os.path.join(feed_dir, 'letters_count.csv')
+    csv_processor = PublicationCSVProcessor(feed_file, words_csv_file, letters_csv_file)
+    # Output files of the run are never taken as input, even if the input is the feed directory
+    input_files = find_input_files(p_args.input, [feed_file, words_csv_file, letters_csv_file,
+                                                  csv_processor.state_file, csv_processor.state_file + '.tmp'])
+    if not input_files:
+        print(f"No TXT, JSON or XML files found for '{p_args.input}'", file=sys.stderr)
+        return
+
+    sql_processor = PublicationSQLProcessor(p_args.db)
+    normalizer = FieldNormalizer()
+    db_report = {}
+    processed_files = []
+    failed_files = []
+    records_count = 0
+    bytes_count = 0
+    start = time.perf_counter()
+
+    with FileManager(feed_file) as file_manager:
+        for input_file_path in input_files:
+            file_size = os.path.getsize(input_file_path)
+            feed_checkpoint = file_manager.checkpoint()
+            try:
+                records_count += ingest_publications(FileManager.iter_file_publications(input_file_path),
+                                                     file_manager, sql_processor, normalizer, db_report,
+                                                     p_args.batch_size)
+            except Exception as e:
+                # One bad file must not stop the run
+                print(f"Failed to process '{input_file_path}': {e}", file=sys.stderr)
+                file_manager.rollback(feed_checkpoint)
+                failed_files.append(input_file_path)
+                continue
+            file_manager.flush()
+            os.remove(input_file_path)  # All batches of the file are committed
+            processed_files.append(input_file_path)
+            bytes_count += file_size
+    ingest_time = time.perf_counter() - start
+
+    # Count words and letters statistics for new publications once for the whole run
+    csv_processor.process_incremental()
+    total_time = time.perf_counter() - start
+
+    print_ingest_report(db_report, normalizer)
+    print(f"Processed {len(processed_files)} files ({len(failed_files)} failed), {records_count} publications, "
+          f"{bytes_count / 1024 / 1024:.2f} MB in {total_time:.2f} s "
+          f"(ingest {ingest_time:.2f} s, statistics {total_time - ingest_time:.2f} s)")
+    print(f"Throughput: {records_count / ingest_time if ingest_time else 0:.0f} publications/s, "
+          f"{len(processed_files) / ingest_time if ingest_time else 0:.1f} files/s, "
+          f"{bytes_count / 1024 / 1024 / ingest_time if ingest_time else 0:.2f} MB/s")
+
+
+def parse_args(p_argv: list[str] = None) -> argparse.Namespace:
+    """Parses command line options of the batch mode."""
+    parser = argparse.ArgumentParser(description="User-generated news feed. "
+                                                 "Without --input it asks for publications interactively.")
+    parser.add_argument('--input', help="Directory or glob pattern of TXT, JSON and XML files to process")
+    parser.add_argument('--db', default='publication.db', help="SQLite database for publications")
+    parser.add_argument('--feed', default='publications.txt',
+                        help="Feed file, CSV statistics files are written next to it")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Number of publications saved at once")
+    return parser.parse_args(p_argv)
+
+
 def main():
     """Main function to determine how to process publications: console or file."""
+    args = parse_args()
+    if args.input:
+        run_batch(args)
+        return
+
     publication_file_name = 'publications.txt'
     words_csv_file_name = 'words_count.csv'
     letters_csv_file_name = 'letters_count.csv'
@@ -483,6 +1164,7 @@ def main():
     xml_input_file_name = 'texts_for_publications.xml'
     csv_processor = PublicationCSVProcessor(publication_file, words_csv_file, letters_csv_file)
     publications_db = 'publication.db'
+    publication_batch_size = 1000
 
     print("\nWelcome to the User-Generated News Feed!")
     print("Please choose how would you like to input publications:")
@@ -540,23 +1222,15 @@ def main():
                         publication_texts = FileManager.read_json_file(input_file_path)
                     case _:
                         publication_texts = FileManager.read_xml_file(input_file_path)
-            publication_texts_updated = \
-                [{capitalize_sentences(str(k)): capitalize_sentences(str(v)) for k, v in d.items()}
-                 for d in publication_texts]
-
-            publications_list = []
-            for publication_item in publication_texts_updated:
-                match publication_item["Type"]:
-                    case "News":
-                        publications_list.append(News(publication_item))
-                    case "Private_ad":
-                        publications_list.append(PrivateAd(publication_item))
-                    case "Joke":
-                        publications_list.append(Joke(publication_item))
-            FileManager(publication_file).save_publications(publications_list)
-            PublicationSQLProcessor(publications_db).save_publications_db(publication_texts_updated)
-            csv_processor.process_words()  # Count the words
-            csv_processor.process_letters()  # Count letters statistics
+            file_manager = FileManager(publication_file)
+            sql_processor = PublicationSQLProcessor(publications_db)
+            db_report = {}
+            normalizer = FieldNormalizer()
+            ingest_publications(publication_texts, file_manager, sql_processor, normalizer, db_report,
+                                publication_batch_size)
+            print_ingest_report(db_report, normalizer)
+            sql_processor.print_records()
+            csv_processor.process_incremental()  # Count words and letters statistics for new publications
             print('\nFile was successfully processed and deleted. Data saved into Data base.')
             exit_requested = True
 
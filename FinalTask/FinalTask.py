@@ -8,8 +8,23 @@ Create a tool which will calculate straight-line distance between different citi
 Do not forgot that Earth is a sphere, so length of one degree is different.
 """
 
+import argparse
+import csv
+import json
 import math
+import os
+import random
 import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is needed only for matrix calculations
+    np = None
 
 
 class DBProcessor:
@@ -18,9 +33,12 @@ class DBProcessor:
     def __init__(self, p_db_name: str = 'cities.db'):
         self.db_name = p_db_name
         self.cities_table = 'cities_coordinates'
+        self.grid_cell_size = 1.0  # Size of spatial index cell in degrees
         self.connection = sqlite3.connect(self.db_name)
         self.cursor = self.connection.cursor()
         self.create_tables()  # Initialize tables on startup
+        self.migrate_grid_cells()  # Fill spatial index cells for DB files created without them
+        self.migrate_city_name_upper()  # Fill indexed upper-case city names for DB files created without them
 
     def create_tables(self):
         """Creates table if it does not exist."""
@@ -28,35 +46,316 @@ class DBProcessor:
             CREATE TABLE IF NOT EXISTS city_coordinates (
                 city_name TEXT PRIMARY KEY,
                 latitude REAL,
-                longitude REAL
+                longitude REAL,
+                cell_lat INTEGER,
+                cell_lon INTEGER,
+                city_name_upper TEXT
             )
         """
         # Creating table
         self.cursor.execute(cities_tbl_create_script)
         self.connection.commit()  # Commit table creation
 
+    def migrate_grid_cells(self):
+        """Adds grid cell columns to older DB files, fills them and creates the spatial index."""
+        self.cursor.execute("PRAGMA table_info(city_coordinates)")
+        columns = [column_info[1] for column_info in self.cursor.fetchall()]
+        with self.connection:
+            for column in ('cell_lat', 'cell_lon'):
+                if column not in columns:
+                    self.cursor.execute(f"ALTER TABLE city_coordinates ADD COLUMN {column} INTEGER")
+
+            self.cursor.execute("SELECT city_name, latitude, longitude FROM city_coordinates WHERE cell_lat IS NULL")
+            cell_updates = [self.get_grid_cell(latitude, longitude) + (city_name,)
+                            for city_name, latitude, longitude in self.cursor.fetchall()]
+            self.cursor.executemany("UPDATE city_coordinates SET cell_lat = ?, cell_lon = ? WHERE city_name = ?",
+                                    cell_updates)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS city_coordinates_cell_idx ON city_coordinates (cell_lat, cell_lon)
+                """)
+
+    def migrate_city_name_upper(self):
+        """Adds upper-case city name column to older DB files, fills it and creates the index used by lookups."""
+        self.cursor.execute("PRAGMA table_info(city_coordinates)")
+        columns = [column_info[1] for column_info in self.cursor.fetchall()]
+        with self.connection:
+            if 'city_name_upper' not in columns:
+                self.cursor.execute("ALTER TABLE city_coordinates ADD COLUMN city_name_upper TEXT")
+
+            self.cursor.execute("SELECT city_name FROM city_coordinates WHERE city_name_upper IS NULL")
+            name_updates = [(city_name.upper(), city_name) for city_name, in self.cursor.fetchall()]
+            self.cursor.executemany("UPDATE city_coordinates SET city_name_upper = ? WHERE city_name = ?",
+                                    name_updates)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS city_coordinates_name_upper_idx ON city_coordinates (city_name_upper)
+                """)
+
+    def get_grid_cell(self, latitude, longitude) -> tuple[int, int]:
+        """Returns spatial index cell of the coordinates."""
+        return math.floor(latitude / self.grid_cell_size), math.floor(longitude / self.grid_cell_size)
+
     def get_db_city_coordinates(self, city_name):
         """Fetch coordinates for a city if it exists in the database."""
         self.cursor.execute("""
-            SELECT latitude, longitude FROM city_coordinates WHERE upper(city_name) = ?
+            SELECT latitude, longitude FROM city_coordinates WHERE city_name_upper = ?
             """, (city_name.upper(),))
         return self.cursor.fetchone()
 
+    def get_db_cities_coordinates(self, city_names: list[str]) -> dict:
+        """Fetch coordinates for many cities with one query, returns dict of upper-case city name -> coordinates."""
+        upper_names = list({city_name.upper() for city_name in city_names})
+        self.cursor.execute("""
+            SELECT city_name_upper, latitude, longitude FROM city_coordinates
+            WHERE city_name_upper IN (SELECT value FROM json_each(?))
+            """, (json.dumps(upper_names),))
+        return {city_name: (latitude, longitude) for city_name, latitude, longitude in self.cursor.fetchall()}
+
+    def get_db_cities_in_box(self, lat_min, lat_max, lon_ranges: list[tuple[float, float]]) -> list[tuple]:
+        """Fetch cities located in grid cells covering the latitude band and longitude ranges."""
+        lon_conditions = []
+        params = [math.floor(lat_min / self.grid_cell_size), math.floor(lat_max / self.grid_cell_size)]
+        for lon_min, lon_max in lon_ranges:
+            lon_conditions.append("cell_lon BETWEEN ? AND ?")
+            params += [math.floor(lon_min / self.grid_cell_size), math.floor(lon_max / self.grid_cell_size)]
+
+        self.cursor.execute(f"""
+            SELECT city_name, latitude, longitude FROM city_coordinates
+            WHERE cell_lat BETWEEN ? AND ? AND ({' OR '.join(lon_conditions)})
+            """, params)
+        return self.cursor.fetchall()
+
     def save_city_coordinates(self, city_name, latitude, longitude):
         """Store coordinates for a new city."""
-        self.cursor.execute("INSERT OR REPLACE INTO city_coordinates (city_name, latitude, longitude) VALUES (?, ?, ?)",
-                            (city_name, latitude, longitude))
+        cell_lat, cell_lon = self.get_grid_cell(latitude, longitude)
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO city_coordinates
+                (city_name, latitude, longitude, cell_lat, cell_lon, city_name_upper)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, (city_name, latitude, longitude, cell_lat, cell_lon, city_name.upper()))
         self.connection.commit()
 
+    def import_cities(self, p_file_path: str, p_delimiter: str = ',', p_name_column: int = 0,
+                      p_latitude_column: int = 1, p_longitude_column: int = 2, p_skip_header: bool = False,
+                      p_quoting: int = csv.QUOTE_MINIMAL, p_batch_size: int = 100000) -> dict:
+        """Bulk import of city coordinates from a delimited file, e.g. CSV or GeoNames dump
+        (GeoNames: p_delimiter='\\t', p_name_column=1, p_latitude_column=4, p_longitude_column=5,
+        p_quoting=csv.QUOTE_NONE).
+        The file is streamed and inserted with executemany in transactions of p_batch_size rows.
+        During the load WAL journal and synchronous=OFF are used and secondary indexes are dropped,
+        they are created again after the load. Returns number of imported and skipped rows and import speed.
+        """
+        journal_mode = self.cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = self.cursor.execute("PRAGMA synchronous").fetchone()[0]
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=OFF")
+        self.cursor.execute("DROP INDEX IF EXISTS city_coordinates_cell_idx")
+        self.cursor.execute("DROP INDEX IF EXISTS city_coordinates_name_upper_idx")
+
+        imported_count = 0
+        skipped_count = 0
+        start = time.perf_counter()
+        try:
+            with open(p_file_path, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.reader(file, delimiter=p_delimiter, quoting=p_quoting)
+                if p_skip_header:
+                    next(reader, None)
+
+                batch = []
+                for row in reader:
+                    try:
+                        city_name = row[p_name_column]
+                        latitude, longitude = float(row[p_latitude_column]), float(row[p_longitude_column])
+                    except (IndexError, ValueError):
+                        skipped_count += 1
+                        continue
+                    if not city_name or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+                        skipped_count += 1
+                        continue
+
+                    batch.append((city_name, latitude, longitude) + self.get_grid_cell(latitude, longitude) +
+                                 (city_name.upper(),))
+                    if len(batch) >= p_batch_size:
+                        self.insert_cities(batch)
+                        imported_count += len(batch)
+                        batch = []
+
+                if batch:
+                    self.insert_cities(batch)
+                    imported_count += len(batch)
+        finally:
+            # Indexes are created after the load, with one sort instead of updating them on every insert
+            with self.connection:
+                self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS city_coordinates_cell_idx ON city_coordinates (cell_lat, cell_lon)
+                    """)
+                self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS city_coordinates_name_upper_idx ON city_coordinates (city_name_upper)
+                    """)
+            self.cursor.execute(f"PRAGMA synchronous={synchronous}")
+            self.cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+
+        elapsed_time = time.perf_counter() - start
+        return {'imported': imported_count, 'skipped': skipped_count, 'seconds': elapsed_time,
+                'rows_per_second': imported_count / elapsed_time if elapsed_time else 0.0}
+
+    def insert_cities(self, p_rows: list[tuple]):
+        """Inserts prepared city rows in one transaction."""
+        with self.connection:
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO city_coordinates
+                    (city_name, latitude, longitude, cell_lat, cell_lon, city_name_upper)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """, p_rows)
+
     def close(self):
         """Closes the database connection."""
         self.connection.close()
 
 
+class CachedDBProcessor(DBProcessor):
+    """DB processor with bounded LRU cache of city coordinates and optional entries time to live."""
+
+    def __init__(self, p_db_name: str = 'cities.db', p_cache_size: int = 1024, p_cache_ttl: float = None):
+        super().__init__(p_db_name)
+        self.cache_size = p_cache_size
+        self.cache_ttl = p_cache_ttl  # Seconds, None means entries don't expire
+        self.cache = OrderedDict()  # Upper-case city name -> (coordinates, expiration time)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def get_cached_coordinates(self, upper_name: str):
+        """Returns cached coordinates of the city and marks them as recently used, None if not cached or expired."""
+        cache_entry = self.cache.get(upper_name)
+        if cache_entry is None:
+            return None
+        coordinates, expires_at = cache_entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.cache[upper_name]
+            return None
+        self.cache.move_to_end(upper_name)
+        return coordinates
+
+    def put_cached_coordinates(self, upper_name: str, coordinates):
+        """Adds coordinates to the cache, removing least recently used entries above the cache size."""
+        expires_at = time.monotonic() + self.cache_ttl if self.cache_ttl is not None else None
+        self.cache[upper_name] = (coordinates, expires_at)
+        self.cache.move_to_end(upper_name)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get_db_city_coordinates(self, city_name):
+        """Fetch coordinates for a city from the cache or the database."""
+        upper_name = city_name.upper()
+        coordinates = self.get_cached_coordinates(upper_name)
+        if coordinates is not None:
+            self.cache_hits += 1
+            return coordinates
+
+        self.cache_misses += 1
+        coordinates = super().get_db_city_coordinates(city_name)
+        if coordinates is not None:
+            self.put_cached_coordinates(upper_name, coordinates)
+        return coordinates
+
+    def get_db_cities_coordinates(self, city_names: list[str]) -> dict:
+        """Fetch coordinates for many cities, cities missing in the cache are fetched with one query."""
+        coordinates = {}
+        missing_names = []
+        for upper_name in {city_name.upper() for city_name in city_names}:
+            city_coordinates = self.get_cached_coordinates(upper_name)
+            if city_coordinates is not None:
+                self.cache_hits += 1
+                coordinates[upper_name] = city_coordinates
+            else:
+                self.cache_misses += 1
+                missing_names.append(upper_name)
+
+        if missing_names:
+            fetched_coordinates = super().get_db_cities_coordinates(missing_names)
+            for upper_name, city_coordinates in fetched_coordinates.items():
+                self.put_cached_coordinates(upper_name, city_coordinates)
+            coordinates.update(fetched_coordinates)
+        return coordinates
+
+    def warm(self, city_names: list[str]):
+        """Preloads coordinates of many cities into the cache with one query."""
+        for upper_name, coordinates in super().get_db_cities_coordinates(city_names).items():
+            self.put_cached_coordinates(upper_name, coordinates)
+
+    def save_city_coordinates(self, city_name, latitude, longitude):
+        """Store coordinates for a new city and drop its outdated cache entry."""
+        super().save_city_coordinates(city_name, latitude, longitude)
+        self.cache.pop(city_name.upper(), None)
+
+    def import_cities(self, p_file_path: str, *args, **kwargs) -> dict:
+        """Bulk import of city coordinates, the whole cache is dropped as any cached city can be replaced."""
+        try:
+            return super().import_cities(p_file_path, *args, **kwargs)
+        finally:
+            self.cache.clear()
+
+    def cache_info(self) -> dict:
+        """Returns cache hit and miss counters and the current cache size."""
+        requests_count = self.cache_hits + self.cache_misses
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self.cache),
+                'hit_rate': self.cache_hits / requests_count if requests_count else 0.0}
+
+
+class HaversineKernel:
+    """Vectorized distance calculation between pairs of points given by indexes in arrays of coordinates.
+    Radians and cosines of latitudes are calculated once per point, not once per pair.
+
+    Accuracy relative to the float64 scalar calculate_haversine() (measured by benchmark_haversine()):
+      - haversine, float64: differences are at the level of floating point rounding (below 1e-9 km);
+      - haversine, float32: absolute error below 5 m for any distance, including nearly antipodal points
+        (points and results are stored in float32, the formula itself is computed in float64);
+      - equirectangular approximation, float64: relative error below 0.02% for distances up to 100 km
+        and below 0.3% up to 500 km at latitudes within +-70 degrees; it grows quickly near the poles
+        (about 10% for 500 km at +-85 degrees) and for long distances, so use it only for short distances.
+    These bounds are asserted by check_haversine_accuracy().
+    """
+
+    def __init__(self, latitudes, longitudes, p_dtype: str = 'float64'):
+        if np is None:
+            raise ImportError("NumPy is required for vectorized distance calculation")
+        self.dtype = np.dtype(p_dtype)
+        self.latitudes = np.radians(np.asarray(latitudes, dtype='float64')).astype(self.dtype)
+        self.longitudes = np.radians(np.asarray(longitudes, dtype='float64')).astype(self.dtype)
+        self.cos_latitudes = np.cos(self.latitudes.astype('float64'))
+        self.earth_radius = self.dtype.type(6371.0)  # Earth's radius in kilometers
+
+    def haversine(self, index1, index2):
+        """Calculate distances in kilometers between points index1[i] and index2[i] with the Haversine formula."""
+        # Computed in float64 even for float32 points: in float32 1 - a loses precision for nearly antipodal points
+        lat1 = np.asarray(self.latitudes[index1], dtype='float64')
+        lat2 = np.asarray(self.latitudes[index2], dtype='float64')
+        cos_lat1, cos_lat2 = self.cos_latitudes[index1], self.cos_latitudes[index2]
+        d_lon = np.asarray(self.longitudes[index2], dtype='float64') - self.longitudes[index1]
+        sin_d_lat = np.sin((lat2 - lat1) / 2)
+        sin_d_lon = np.sin(d_lon / 2)
+        a = sin_d_lat * sin_d_lat + cos_lat1 * cos_lat2 * sin_d_lon * sin_d_lon
+        return (2 * self.earth_radius * np.arcsin(np.sqrt(np.clip(a, 0, 1)))).astype(self.dtype, copy=False)
+
+    def equirectangular(self, index1, index2):
+        """Calculate approximate distances in kilometers treating the Earth as flat around the mean latitude.
+        Faster than haversine(), suitable only for short distances (see class description for error bounds).
+        """
+        lat1, lat2 = self.latitudes[index1], self.latitudes[index2]
+        d_lon = self.longitudes[index2] - self.longitudes[index1]
+        d_lon = (d_lon + np.pi) % (2 * np.pi) - np.pi  # Shortest way around the antimeridian
+        x = d_lon * np.cos((lat1 + lat2) / 2)
+        y = lat2 - lat1
+        return self.earth_radius * np.sqrt(x * x + y * y)
+
+
 class DistanceCalculation:
     """Calculates the straight-line distance between cities using the Haversine formula."""
-    def __init__(self):
-        self.db_processor = DBProcessor()
+    def __init__(self, p_db_name: str = 'cities.db', p_cache_size: int = 1024, p_cache_ttl: float = None):
+        self.db_processor = CachedDBProcessor(p_db_name, p_cache_size, p_cache_ttl)
+
+    def warm(self, cities: list[str]):
+        """Preloads coordinates of the cities into the coordinates cache."""
+        self.db_processor.warm(cities)
 
     def get_city_coordinates(self, city_name: str):
         """Get city coordinates from DB or ask user to enter."""
@@ -80,19 +379,393 @@ class DistanceCalculation:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
         return r * c
 
+    def get_cities_kernel(self, cities: list[str], p_dtype: str = 'float64') -> HaversineKernel:
+        """Get coordinates of all cities with one DB query as a HaversineKernel indexed in the order of cities."""
+        if np is None:
+            raise ImportError("NumPy is required for distance matrix calculation")
+
+        coordinates = self.db_processor.get_db_cities_coordinates(cities)
+        missing_cities = [city_name for city_name in cities if city_name.upper() not in coordinates]
+        if missing_cities:
+            raise ValueError(f"Coordinates not found for cities: {', '.join(missing_cities)}")
+
+        # Keep two columns for an empty list of cities
+        points = np.array([coordinates[city_name.upper()] for city_name in cities], dtype='float64').reshape(-1, 2)
+        return HaversineKernel(points[:, 0], points[:, 1], p_dtype)
+
+    def iter_distance_matrix(self, cities: list[str], p_dtype: str = 'float64', p_memory_budget_mb: float = 64):
+        """Yield (first row index, block of rows) of the distance matrix between cities.
+        Block size is chosen so temporary arrays of one block fit into the memory budget.
+        """
+        kernel = self.get_cities_kernel(cities, p_dtype)
+        cities_count = len(cities)
+        # About six float64 arrays of block size exist at once while a block is calculated, whatever p_dtype is
+        block_row_bytes = max(1, cities_count) * np.dtype('float64').itemsize * 6
+        block_rows = max(1, int(p_memory_budget_mb * 1024 * 1024 // block_row_bytes))
+        # Row and column indexes are broadcast to a block of pairs
+        columns = np.arange(cities_count)[np.newaxis, :]
+
+        for row_start in range(0, cities_count, block_rows):
+            row_end = min(row_start + block_rows, cities_count)
+            yield row_start, kernel.haversine(np.arange(row_start, row_end)[:, np.newaxis], columns)
+
+    def distance_matrix(self, cities: list[str], p_dtype: str = 'float64', p_memory_budget_mb: float = None):
+        """Calculate N x N matrix of distances in kilometers between all given cities.
+        If memory budget is set, the matrix is calculated in row blocks and the full matrix must fit into the budget;
+        use iter_distance_matrix() to process matrices larger than the budget block by block.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for distance matrix calculation")
+        if p_memory_budget_mb is None:
+            indexes = np.arange(len(cities))
+            return self.get_cities_kernel(cities, p_dtype).haversine(indexes[:, np.newaxis], indexes[np.newaxis, :])
+
+        matrix_bytes = len(cities) ** 2 * np.dtype(p_dtype).itemsize
+        if matrix_bytes > p_memory_budget_mb * 1024 * 1024:
+            raise MemoryError(f"Distance matrix needs {matrix_bytes / 1024 / 1024:.1f} MB, "
+                              f"budget is {p_memory_budget_mb} MB. Use iter_distance_matrix() instead.")
+
+        matrix = np.empty((len(cities), len(cities)), dtype=p_dtype)
+        block_budget_mb = p_memory_budget_mb - matrix_bytes / 1024 / 1024
+        for row_start, block in self.iter_distance_matrix(cities, p_dtype, block_budget_mb):
+            matrix[row_start:row_start + len(block)] = block
+        return matrix
+
+    def within_radius(self, latitude, longitude, radius_km) -> list[tuple[str, float]]:
+        """Find all cities within radius of the point, returns (city name, distance) pairs sorted by distance.
+        Only cities from grid cells of the bounding box around the circle are checked with the Haversine formula.
+        """
+        r = 6371.0  # Earth's radius in kilometers
+        angular_radius = radius_km / r
+        d_lat = math.degrees(angular_radius)
+        lat_min, lat_max = max(latitude - d_lat, -90.0), min(latitude + d_lat, 90.0)
+
+        if lat_min <= -90.0 or lat_max >= 90.0 or angular_radius >= math.pi / 2:
+            lon_ranges = [(-180.0, 180.0)]  # Circle contains a pole, all longitudes are possible
+        else:
+            d_lon = math.degrees(math.asin(min(1.0, math.sin(angular_radius) / math.cos(math.radians(latitude)))))
+            lon_min, lon_max = longitude - d_lon, longitude + d_lon
+            if lon_max - lon_min >= 360.0:
+                lon_ranges = [(-180.0, 180.0)]
+            elif lon_min < -180.0:  # Box crosses the antimeridian
+                lon_ranges = [(lon_min + 360.0, 180.0), (-180.0, lon_max)]
+            elif lon_max > 180.0:
+                lon_ranges = [(lon_min, 180.0), (-180.0, lon_max - 360.0)]
+            else:
+                lon_ranges = [(lon_min, lon_max)]
+
+        cities = []
+        for city_name, city_lat, city_lon in self.db_processor.get_db_cities_in_box(lat_min, lat_max, lon_ranges):
+            distance = self.calculate_haversine(latitude, longitude, city_lat, city_lon)
+            if distance <= radius_km:
+                cities.append((city_name, distance))
+        return sorted(cities, key=lambda city: city[1])
+
+    def nearest(self, latitude, longitude, k: int = 1) -> list[tuple[str, float]]:
+        """Find k cities nearest to the point, returns (city name, distance) pairs sorted by distance.
+        Search radius is doubled until it contains k cities or covers the whole globe.
+        """
+        radius_km = 50.0
+        max_radius_km = math.pi * 6371.0  # Half of the Earth's circumference
+        while True:
+            cities = self.within_radius(latitude, longitude, radius_km)
+            if len(cities) >= k or radius_km >= max_radius_km:
+                return cities[:k]
+            radius_km = min(radius_km * 2, max_radius_km)
+
     def calculate_distance(self, city1, city2):
         """Calculate distance between two cities."""
         lat1, lon1 = self.get_city_coordinates(city1)
         lat2, lon2 = self.get_city_coordinates(city2)
         return self.calculate_haversine(lat1, lon1, lat2, lon2)
 
+    def calculate_distances_stream(self, pairs, p_writer, p_reject_writer,
+                                   p_batch_size: int = 10000) -> tuple[int, int]:
+        """Calculate distances for an iterable of (city1, city2) rows and write them as CSV rows.
+        Coordinates are fetched once per batch of pairs; rows with unknown cities or wrong structure are
+        written to the reject writer instead of asking user for coordinates, blank rows are skipped.
+        Returns the number of calculated and rejected pairs.
+        """
+        pairs = iter(pairs)
+        calculated_count = 0
+        rejected_count = 0
+
+        while pairs_batch := list(islice(pairs, p_batch_size)):
+            city_names = [city_name for pair in pairs_batch if len(pair) == 2 for city_name in pair]
+            coordinates = self.db_processor.get_db_cities_coordinates(city_names)
+
+            for pair in pairs_batch:
+                if not any(field.strip() for field in pair):
+                    continue  # Blank lines are skipped
+                if len(pair) != 2:
+                    # Raw fields are kept in the first column, so rejects keep the city1,city2,reason structure
+                    p_reject_writer.writerow([','.join(pair), '', 'incorrect row structure'])
+                    rejected_count += 1
+                    continue
+
+                city1, city2 = pair
+                point1, point2 = coordinates.get(city1.upper()), coordinates.get(city2.upper())
+                if point1 is None or point2 is None:
+                    unknown_cities = [city for city, point in ((city1, point1), (city2, point2)) if point is None]
+                    p_reject_writer.writerow([city1, city2, f"unknown city: {', '.join(unknown_cities)}"])
+                    rejected_count += 1
+                    continue
+
+                distance = self.calculate_haversine(point1[0], point1[1], point2[0], point2[1])
+                p_writer.writerow([city1, city2, f"{distance:.2f}"])
+                calculated_count += 1
+
+        return calculated_count, rejected_count
+
     def close(self):
         """Closes the database connection through the manager."""
         self.db_processor.close()
 
 
+def generate_cities(p_db_processor: DBProcessor, p_cities_count: int, p_generator: random.Random):
+    """Fills the DB with generated cities spread uniformly over the globe, used by benchmarks."""
+    cities = []
+    for i in range(p_cities_count):
+        latitude, longitude = math.degrees(math.asin(p_generator.uniform(-1, 1))), p_generator.uniform(-180, 180)
+        cities.append((f"City_{i}", latitude, longitude) + p_db_processor.get_grid_cell(latitude, longitude) +
+                      (f"CITY_{i}",))
+    p_db_processor.insert_cities(cities)
+
+
+def benchmark_city_lookup(p_table_sizes: tuple = (1000, 10000, 100000), p_lookups: int = 1000, p_seed: int = 1):
+    """Compares lookup latency by upper(city_name) with lookup by the indexed upper-case name column."""
+    generator = random.Random(p_seed)
+
+    for table_size in p_table_sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_processor = DBProcessor(os.path.join(tmp_dir, 'cities.db'))
+            generate_cities(db_processor, table_size, generator)
+            city_names = [f"city_{generator.randrange(table_size)}" for _ in range(p_lookups)]
+
+            start = time.perf_counter()
+            for city_name in city_names:
+                db_processor.cursor.execute("""
+                    SELECT latitude, longitude FROM city_coordinates WHERE upper(city_name) = ?
+                    """, (city_name.upper(),))
+                db_processor.cursor.fetchone()
+            scan_time = (time.perf_counter() - start) / p_lookups
+
+            start = time.perf_counter()
+            for city_name in city_names:
+                db_processor.get_db_city_coordinates(city_name)
+            indexed_time = (time.perf_counter() - start) / p_lookups
+            db_processor.close()
+
+        print(f"Table size {table_size}: upper(city_name) {scan_time * 1e6:.1f} us, "
+              f"indexed city_name_upper {indexed_time * 1e6:.1f} us per lookup")
+
+
+def benchmark_spatial_index(p_cities_count: int = 100000, p_queries: int = 100, p_k: int = 5,
+                            p_radius_km: float = 200.0, p_seed: int = 1):
+    """Compares nearest() and within_radius() with a brute-force scan over a generated gazetteer."""
+    generator = random.Random(p_seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calculator = DistanceCalculation(os.path.join(tmp_dir, 'cities.db'))
+        db_processor = calculator.db_processor
+        generate_cities(db_processor, p_cities_count, generator)
+
+        points = [(math.degrees(math.asin(generator.uniform(-1, 1))), generator.uniform(-180, 180))
+                  for _ in range(p_queries)]
+
+        start = time.perf_counter()
+        indexed_results = [(calculator.nearest(lat, lon, p_k), calculator.within_radius(lat, lon, p_radius_km))
+                           for lat, lon in points]
+        indexed_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        brute_force_results = []
+        for lat, lon in points:
+            db_processor.cursor.execute("SELECT city_name, latitude, longitude FROM city_coordinates")
+            distances = sorted(((city_name, calculator.calculate_haversine(lat, lon, city_lat, city_lon))
+                                for city_name, city_lat, city_lon in db_processor.cursor.fetchall()),
+                               key=lambda city: city[1])
+            brute_force_results.append((distances[:p_k], [city for city in distances if city[1] <= p_radius_km]))
+        brute_force_time = time.perf_counter() - start
+        calculator.close()
+
+    print(f"Cities: {p_cities_count}, queries: {p_queries}")
+    print(f"Spatial index: {indexed_time:.2f} s")
+    print(f"Brute-force scan: {brute_force_time:.2f} s ({brute_force_time / indexed_time:.1f}x slower)")
+    print(f"Identical results: {indexed_results == brute_force_results}")
+
+
+def run_batch(p_args: argparse.Namespace):
+    """Imports cities from a delimited file or calculates distances for city pairs from CSV file or stdin
+    and streams results to CSV file or stdout.
+    """
+    calculator = DistanceCalculation(p_args.db)
+    if p_args.import_cities:
+        try:
+            import_report = calculator.db_processor.import_cities(
+                p_args.import_cities, p_args.delimiter.replace('\\t', '\t'), p_args.name_column,
+                p_args.latitude_column, p_args.longitude_column, p_args.header,
+                csv.QUOTE_NONE if p_args.no_quoting else csv.QUOTE_MINIMAL, p_args.batch_size)
+        finally:
+            calculator.close()
+        print(f"Imported {import_report['imported']} cities, skipped {import_report['skipped']} rows "
+              f"in {import_report['seconds']:.2f} s, {import_report['rows_per_second']:.0f} rows/s", file=sys.stderr)
+        return
+
+    input_file = open(p_args.input, 'r', newline='', encoding='utf-8') if p_args.input != '-' else sys.stdin
+    output_file = open(p_args.output, 'w', newline='', encoding='utf-8') if p_args.output != '-' else sys.stdout
+    reject_file = open(p_args.rejects, 'w', newline='', encoding='utf-8')
+
+    try:
+        reader = csv.reader(input_file)
+        if p_args.header:
+            next(reader, None)
+        writer = csv.writer(output_file)
+        writer.writerow(['city1', 'city2', 'distance_km'])
+        reject_writer = csv.writer(reject_file)
+        reject_writer.writerow(['city1', 'city2', 'reason'])
+
+        start = time.perf_counter()
+        calculated_count, rejected_count = \
+            calculator.calculate_distances_stream(reader, writer, reject_writer, p_args.batch_size)
+        elapsed_time = time.perf_counter() - start
+    finally:
+        for file in (input_file, output_file, reject_file):
+            if file not in (sys.stdin, sys.stdout):
+                file.close()
+        calculator.close()
+
+    pairs_count = calculated_count + rejected_count
+    print(f"Processed {pairs_count} pairs ({calculated_count} calculated, {rejected_count} rejected) "
+          f"in {elapsed_time:.2f} s, {pairs_count / elapsed_time if elapsed_time else 0:.0f} pairs/s",
+          file=sys.stderr)
+
+
+def parse_args(p_argv: list[str] = None) -> argparse.Namespace:
+    """Parses command line options of the batch mode."""
+    parser = argparse.ArgumentParser(description="Straight-line distance calculator. "
+                                                 "Without --input it asks for two cities interactively.")
+    parser.add_argument('--input', help="CSV file with city1,city2 pairs, '-' for stdin")
+    parser.add_argument('--output', default='-', help="CSV file for calculated distances, '-' for stdout")
+    parser.add_argument('--rejects', default='rejected_pairs.csv', help="CSV file for pairs with unknown cities")
+    parser.add_argument('--header', action='store_true', help="Skip the first row of the input file")
+    parser.add_argument('--batch-size', type=int, default=10000,
+                        help="Number of pairs resolved at once or rows imported in one transaction")
+    parser.add_argument('--db', default='cities.db', help="SQLite database with city coordinates")
+    parser.add_argument('--import-cities', help="Delimited file (CSV, GeoNames dump) to import into the database")
+    parser.add_argument('--delimiter', default=',', help="Delimiter of the imported file, '\\t' for tab")
+    parser.add_argument('--name-column', type=int, default=0, help="Index of city name column in imported file")
+    parser.add_argument('--latitude-column', type=int, default=1, help="Index of latitude column in imported file")
+    parser.add_argument('--longitude-column', type=int, default=2, help="Index of longitude column in imported file")
+    parser.add_argument('--no-quoting', action='store_true', help="Don't treat quotes specially (GeoNames dumps)")
+    return parser.parse_args(p_argv)
+
+
+def check_haversine_accuracy(p_pairs_count: int = 100000, p_seed: int = 1):
+    """Checks HaversineKernel against the error bounds of its description on constructed pairs of points
+    at known distances up to 100 and 500 km at latitudes within +-70 degrees, and float32 against float64 on
+    random and nearly antipodal pairs. Raises AssertionError if a bound is exceeded.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for vectorized distance calculation")
+    generator = np.random.default_rng(p_seed)
+    r = 6371.0  # Earth's radius in kilometers
+
+    # Maximum distance, method, dtype -> error bound (absolute in km or relative)
+    bounds = [(100, 'haversine', 'float64', 'absolute', 1e-6), (500, 'haversine', 'float64', 'absolute', 1e-6),
+              (100, 'haversine', 'float32', 'absolute', 0.005), (500, 'haversine', 'float32', 'absolute', 0.005),
+              (100, 'equirectangular', 'float64', 'relative', 0.0002),
+              (500, 'equirectangular', 'float64', 'relative', 0.003)]
+
+    for max_distance, method_name, dtype, error_type, bound in bounds:
+        # Second point is the destination from the first one at random bearing and distance on the sphere
+        lat1 = np.radians(generator.uniform(-70, 70, p_pairs_count))
+        lon1 = np.radians(generator.uniform(-180, 180, p_pairs_count))
+        bearing = generator.uniform(0, 2 * np.pi, p_pairs_count)
+        distances = generator.uniform(1, max_distance, p_pairs_count)
+        angle = distances / r
+        lat2 = np.arcsin(np.sin(lat1) * np.cos(angle) + np.cos(lat1) * np.sin(angle) * np.cos(bearing))
+        lon2 = lon1 + np.arctan2(np.sin(bearing) * np.sin(angle) * np.cos(lat1),
+                                 np.cos(angle) - np.sin(lat1) * np.sin(lat2))
+        lon2 = (lon2 + np.pi) % (2 * np.pi) - np.pi
+
+        kernel = HaversineKernel(np.degrees(np.concatenate([lat1, lat2])),
+                                 np.degrees(np.concatenate([lon1, lon2])), dtype)
+        indexes = np.arange(p_pairs_count)
+        errors = np.abs(getattr(kernel, method_name)(indexes, indexes + p_pairs_count).astype('float64') - distances)
+        if error_type == 'relative':
+            errors = errors / distances
+        if errors.max() > bound:
+            raise AssertionError(f"{method_name} {dtype} up to {max_distance} km: {error_type} error "
+                                 f"{errors.max():.3e} exceeds {bound:.0e}")
+        print(f"{method_name} {dtype} up to {max_distance} km: max {error_type} error {errors.max():.3e} "
+              f"(bound {bound:.0e})")
+
+    # float32 haversine over the whole globe and for nearly antipodal points, compared with float64
+    latitudes = np.degrees(np.arcsin(generator.uniform(-1, 1, p_pairs_count)))
+    longitudes = generator.uniform(-180, 180, p_pairs_count)
+    pairs_sets = {'random pairs': (np.degrees(np.arcsin(generator.uniform(-1, 1, p_pairs_count))),
+                                   generator.uniform(-180, 180, p_pairs_count)),
+                  'nearly antipodal pairs': (-latitudes + generator.normal(0, 0.01, p_pairs_count),
+                                             (longitudes + generator.normal(0, 0.01, p_pairs_count)) % 360 - 180)}
+    bound = 0.005
+    for pairs_name, (latitudes2, longitudes2) in pairs_sets.items():
+        all_latitudes = np.concatenate([latitudes, np.clip(latitudes2, -90, 90)])
+        all_longitudes = np.concatenate([longitudes, longitudes2])
+        indexes = np.arange(p_pairs_count)
+        expected = HaversineKernel(all_latitudes, all_longitudes).haversine(indexes, indexes + p_pairs_count)
+        result = HaversineKernel(all_latitudes, all_longitudes, 'float32').haversine(indexes, indexes + p_pairs_count)
+        error = np.abs(result.astype('float64') - expected).max()
+        if error > bound:
+            raise AssertionError(f"haversine float32 on {pairs_name}: absolute error {error:.3e} "
+                                 f"exceeds {bound:.0e}")
+        print(f"haversine float32 on {pairs_name}: max absolute error {error:.3e} (bound {bound:.0e})")
+
+
+def benchmark_haversine(p_sizes: tuple = (1000, 100000, 10000000), p_seed: int = 1):
+    """Compares scalar calculate_haversine() with HaversineKernel in float64/float32 and the equirectangular
+    approximation on random pairs of points, printing time and maximum errors for each number of pairs.
+    Error bounds for short distances are checked first by check_haversine_accuracy().
+    """
+    if np is None:
+        raise ImportError("NumPy is required for vectorized distance calculation")
+    check_haversine_accuracy(p_seed=p_seed)
+    generator = np.random.default_rng(p_seed)
+
+    for pairs_count in p_sizes:
+        points_count = max(2, int(math.sqrt(pairs_count)))
+        latitudes = np.degrees(np.arcsin(generator.uniform(-1, 1, points_count)))
+        longitudes = generator.uniform(-180, 180, points_count)
+        index1 = generator.integers(0, points_count, pairs_count)
+        index2 = generator.integers(0, points_count, pairs_count)
+
+        lat1, lon1 = latitudes[index1].tolist(), longitudes[index1].tolist()
+        lat2, lon2 = latitudes[index2].tolist(), longitudes[index2].tolist()
+        start = time.perf_counter()
+        scalar_distances = np.array([DistanceCalculation.calculate_haversine(lat1[i], lon1[i], lat2[i], lon2[i])
+                                     for i in range(pairs_count)])
+        scalar_time = time.perf_counter() - start
+
+        print(f"Pairs: {pairs_count}, scalar: {scalar_time:.3f} s")
+        for method_name, dtype in (('haversine', 'float64'), ('haversine', 'float32'),
+                                   ('equirectangular', 'float64')):
+            kernel = HaversineKernel(latitudes, longitudes, dtype)
+            method = getattr(kernel, method_name)
+            start = time.perf_counter()
+            distances = method(index1, index2)
+            kernel_time = time.perf_counter() - start
+
+            errors = np.abs(distances.astype('float64') - scalar_distances)
+            print(f"  {method_name} {dtype}: {kernel_time:.3f} s ({scalar_time / kernel_time:.0f}x faster), "
+                  f"max abs error {errors.max():.6f} km")
+
+
 def main():
     """Main function to determine how to process publications: console or file."""
+    args = parse_args()
+    if args.input or args.import_cities:
+        run_batch(args)
+        return
 
     print("\nWelcome to the distance_calculator!")
     calculator = DistanceCalculation()
@@ -71,8 +71,10 @@ import csv
 from collections import Counter
 import re
 from datetime import datetime, timedelta
-from strings_func_4 import capitalize_sentences
+from strings_func_4 import capitalize_sentences, wrap_text
 import json
+from itertools import islice
+from typing import Iterator
 import xml.etree.ElementTree as ElementTree
 
 
@@ -84,36 +86,20 @@ class Publication(object):
         self.text = text
         self.max_length: int = 50
         self.info_line = ''
+        self.text_wrapped = False
 
     def format_publication(self) -> str:
         """Returns the formatted string of the publication to be saved to the file."""
-        self.text = self.split_text(self.text if self.text else 'Here should be your text')
+        # Wrap the text only once, repeated calls reuse it
+        if not self.text_wrapped:
+            self.text = self.split_text(self.text if self.text else 'Here should be your text')
+            self.text_wrapped = True
         formatted_title = f"{self.title} {'-' * (self.max_length - len(self.title))}"
         return f"{formatted_title}\n{self.text}\n"
 
     def split_text(self, line: str) -> str:
         # Split into lines with max_length, keeping whole words intact
-        formatted_text = []
-
-        words = line.strip().split()  # Split each line into words
-        current_line = ""
-
-        for word in words:
-            # Check if adding the next word would exceed the max_length
-            if len(current_line) + len(word) + 1 > self.max_length:
-                formatted_text.append(current_line)  # Append the current line to the result
-                current_line = word  # Start a new line with the current word
-            else:
-                if current_line:
-                    current_line += " " + word  # Add the word to the current line with a space
-                else:
-                    current_line = word  # Start a new line if current_line is empty
-
-        if current_line:
-            formatted_text.append(current_line)  # Append any remaining words in current_line
-
-        # Join the formatted text with newline characters and return it as a single string
-        return '\n'.join(formatted_text)
+        return wrap_text(line, self.max_length)
 
 
 class News(Publication):
@@ -204,13 +190,19 @@ class FileManager:
                 f.write("\n\n")
                 f.write(publication.format_publication())
 
+        self.mode = 'a'  # Next batches are appended after the header
+
     @staticmethod
-    def read_txt_file(p_file_path: str) -> list[dict]:
+    def read_txt_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per line."""
 
         FileManager.validate_file_path(p_file_path, '.txt')
+        return FileManager.iter_txt_publications(p_file_path)
+
+    @staticmethod
+    def iter_txt_publications(p_file_path: str) -> Iterator[dict]:
 
         try:
-            publications = []
             with open(p_file_path, 'r', encoding='utf-8') as file:
                 for line in file:
                     title, text, info_line = (line.split('#') + [""] * 3)[:3]
@@ -226,43 +218,114 @@ class FileManager:
                     elif title == "JOKE":
                         publication["Hashtag"] = info_line
 
-                    publications.append(publication)
-            return publications
+                    yield publication
 
         except ValueError:
             raise ValueError(f"TXT file '{p_file_path}' has an incorrect file structure")
 
     @staticmethod
-    def read_json_file(p_file_path: str) -> list[dict]:
+    def read_json_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per JSON array element."""
 
         FileManager.validate_file_path(p_file_path, '.json')
+        return FileManager.iter_json_publications(p_file_path)
+
+    @staticmethod
+    def iter_json_publications(p_file_path: str, p_chunk_size: int = 65536) -> Iterator[dict]:
+        """Parses the top-level JSON array incrementally, keeping only the not yet parsed part in memory."""
+        decoder = json.JSONDecoder()
 
         try:
             with open(p_file_path, 'r', encoding='utf-8') as file:
-                publications = json.load(file)
+                buffer = ''
+                position = 0
+                end_of_file = False
+                array_started = False
+                expect_separator = False
+                value_required = False
 
-            return publications
+                while True:
+                    # Skip whitespace between tokens
+                    while position < len(buffer) and buffer[position].isspace():
+                        position += 1
+
+                    if position == len(buffer):
+                        if end_of_file:
+                            raise ValueError("Unexpected end of JSON array")
+                        buffer, position = file.read(p_chunk_size), 0
+                        end_of_file = not buffer
+                        continue
+
+                    char = buffer[position]
+                    if not array_started:
+                        if char != '[':
+                            raise ValueError("JSON file should contain an array of publications")
+                        array_started = True
+                        position += 1
+                    elif char == ']':
+                        if value_required:
+                            raise ValueError("Expected a value after ',' in JSON array")
+                        # Only whitespace may follow the array
+                        rest = buffer[position + 1:]
+                        while rest.isspace() or not rest:
+                            rest = file.read(p_chunk_size)
+                            if not rest:
+                                return
+                        raise ValueError("Unexpected data after JSON array")
+                    elif expect_separator:
+                        if char != ',':
+                            raise ValueError("Expected ',' between JSON array elements")
+                        expect_separator = False
+                        value_required = True
+                        position += 1
+                    else:
+                        try:
+                            publication, end = decoder.raw_decode(buffer, position)
+                        except json.JSONDecodeError:
+                            if end_of_file:
+                                raise
+                            end = len(buffer)  # Element is not complete yet
+
+                        if end == len(buffer) and not end_of_file:
+                            # Element may continue in the next chunk; read size grows with the buffer
+                            more_text = file.read(max(p_chunk_size, len(buffer) - position))
+                            end_of_file = not more_text
+                            buffer, position = buffer[position:] + more_text, 0
+                            continue
+
+                        if not isinstance(publication, dict):
+                            raise ValueError("JSON array elements should be publication objects")
+                        expect_separator = True
+                        value_required = False
+                        position = end
+                        yield publication
 
         except ValueError:
             raise ValueError(f"JSON file '{p_file_path}' has an incorrect file structure")
 
     @staticmethod
-    def read_xml_file(p_file_path: str) -> list[dict]:
+    def read_xml_file(p_file_path: str) -> Iterator[dict]:
+        """Validates the file and returns a generator yielding one publication per Publication element."""
 
         FileManager.validate_file_path(p_file_path, '.xml')
+        return FileManager.iter_xml_publications(p_file_path)
+
+    @staticmethod
+    def iter_xml_publications(p_file_path: str) -> Iterator[dict]:
+        """Parses XML with iterparse and clears processed elements, so the tree never grows past one record."""
 
         try:
-            publications = []
-            tree = ElementTree.parse(p_file_path)
-            root = tree.getroot()
+            context = ElementTree.iterparse(p_file_path, events=('start', 'end'))
+            _, root = next(context)
 
-            for record in root.findall('Publication'):
-                record_dict = {}
-                for elem in record:
-                    record_dict[elem.tag] = elem.text
+            for event, elem in context:
+                if event == 'end' and elem.tag == 'Publication':
+                    record_dict = {}
+                    for child in elem:
+                        record_dict[child.tag] = child.text
 
-                publications.append(record_dict)
-            return publications
+                    yield record_dict
+                    root.clear()  # Drop processed records
 
         except ValueError:
             raise ValueError(f"XML file '{p_file_path}' has an incorrect file structure")
@@ -414,6 +477,7 @@ def main():
     json_input_file_name = 'texts_for_publications.json'
     xml_input_file_name = 'texts_for_publications.xml'
     csv_processor = PublicationCSVProcessor(publication_file, words_csv_file, letters_csv_file)
+    publication_batch_size = 1000
 
     print("\nWelcome to the User-Generated News Feed!")
     print("Please choose how would you like to input publications:")
@@ -472,22 +536,27 @@ def main():
                     case _:
                         publication_texts = FileManager.read_xml_file(input_file_path)
 
-            publications_list = []
-            for publication_item in publication_texts:
-                item = {}
-                for key, value in publication_item.items():
-                    if type(value) == str:
-                        item[capitalize_sentences(key)] = capitalize_sentences(value)
-                    else:
-                        item[capitalize_sentences(key)] = value
-                match item["Type"]:
-                    case "News":
-                        publications_list.append(News(item))
-                    case "Private_ad":
-                        publications_list.append(PrivateAd(item))
-                    case "Joke":
-                        publications_list.append(Joke(item))
-            FileManager(publication_file).save_publications(publications_list)
+            file_manager = FileManager(publication_file)
+            publication_texts = iter(publication_texts)
+
+            # Records are read, normalized and saved in batches, so the whole input is never held in memory
+            while publication_batch := list(islice(publication_texts, publication_batch_size)):
+                publications_list = []
+                for publication_item in publication_batch:
+                    item = {}
+                    for key, value in publication_item.items():
+                        if type(value) == str:
+                            item[capitalize_sentences(key)] = capitalize_sentences(value)
+                        else:
+                            item[capitalize_sentences(key)] = value
+                    match item["Type"]:
+                        case "News":
+                            publications_list.append(News(item))
+                        case "Private_ad":
+                            publications_list.append(PrivateAd(item))
+                        case "Joke":
+                            publications_list.append(Joke(item))
+                file_manager.save_publications(publications_list)
             csv_processor.process_words()  # Count the words
             csv_processor.process_letters()  # Count letters statistics
             print('\nFile was successfully processed and deleted')
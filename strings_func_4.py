@@ -1,4 +1,28 @@
+import random
 import re
+from functools import lru_cache
+import sys
+import tempfile
+import time
+
+
+# Precompiled patterns used by capitalize_sentences_fast()
+SENTENCE_SPLIT_PATTERN = re.compile(r'([.!?:#]\s*)')
+SENTENCE_DELIMITER_PATTERN = re.compile(r'[.!?:#]')
+SENTENCE_START_PATTERN = re.compile(r'([.!?:#]\s*)([^.!?:#\s])')
+
+# Precompiled patterns used by the streaming pipeline
+# Tail of a chunk which can belong to a word or an ' iz ' continued in the next chunk, matched on the reversed text:
+# the last word, the whitespace before it and preceding ' iz' words
+REVERSED_CARRY_PATTERN = re.compile(r'\S*\s+(?:[zZ][iI]\s+)*')
+WHITESPACE_PATTERN = re.compile(r'\s')
+# Same matches as in replace_iz_with_is(): a match always starts a whitespace run, and the lookbehind keeps
+# the search from retrying every position of a long whitespace run
+IZ_PATTERN = re.compile(r'(?<!\s)\s+iz\s+')
+SENTENCE_END_SPLIT_PATTERN = re.compile(r'([.!?])')
+WORD_CHAR_PATTERN = re.compile(r'\w')
+SENTENCE_DELIMITERS = ('.', '!', '?', ':', '#')
+INSERTION_PHRASE = "end of this paragraph."
 
 
 # Function to convert text to lowercase
@@ -53,6 +77,307 @@ def capitalize_sentences(text):
     return ''.join(capitalized_sentences)
 
 
+# Function to capitalize the first letter of each sentence, same result as capitalize_sentences()
+# Text without delimiters is one sentence (dates and numbers have no letters, so capitalize() keeps them as-is),
+# ASCII text is lowered once and only sentence starts are changed, other text is split into sentences
+# as in capitalize_sentences(), because lower() of Unicode letters can depend on neighbouring characters
+def capitalize_sentences_fast(text):
+    if not SENTENCE_DELIMITER_PATTERN.search(text):
+        return text.capitalize()
+
+    if text.isascii():
+        lower_text = text[:1].upper() + text[1:].lower()
+        return SENTENCE_START_PATTERN.sub(lambda match: match.group(1) + match.group(2).upper(), lower_text)
+
+    return ''.join([part.capitalize() for part in SENTENCE_SPLIT_PATTERN.split(text)])
+
+
+# Function to capitalize sentences in each text of the list
+def capitalize_sentences_batch(texts):
+    search_delimiter = SENTENCE_DELIMITER_PATTERN.search
+    capitalize = capitalize_sentences_fast
+    return [capitalize(text) if search_delimiter(text) else text.capitalize() for text in texts]
+
+
+# Function to compare capitalize_sentences_fast() with capitalize_sentences() on random texts
+# and measure both on short fields
+def benchmark_capitalize_sentences(fields_count=1000000, checks_count=100000, seed=1):
+    generator = random.Random(seed)
+
+    # Random texts of letters, digits, delimiters, whitespace and non-ASCII characters must give the same result
+    alphabet = 'aBcZ19²٣ \t\n.!?:#/,ÄßΣσİǅ\u2028'
+    for _ in range(checks_count):
+        text = ''.join(generator.choices(alphabet, k=generator.randint(0, 20)))
+        if capitalize_sentences_fast(text) != capitalize_sentences(text):
+            raise AssertionError(f"Different results for {text!r}")
+
+    fields = [generator.choice(['news', 'private_ad', 'joke', 'austin', '2024/12/01', 'tech city',
+                                'why? because!', 'selling: a brAnd-new laPTop.', '#FunnyJoke'])
+              for _ in range(fields_count)]
+
+    start = time.perf_counter()
+    expected = [capitalize_sentences(field) for field in fields]
+    previous_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = capitalize_sentences_batch(fields)
+    batch_time = time.perf_counter() - start
+
+    print(f"Random texts checked: {checks_count}")
+    print(f"capitalize_sentences: {previous_time:.2f} s for {fields_count} fields")
+    print(f"capitalize_sentences_batch: {batch_time:.2f} s ({previous_time / batch_time:.1f}x faster)")
+    print(f"Identical results: {result == expected}")
+
+
+# Function to get the regular expression matching one wrapped line of words separated by single spaces:
+# a word longer than max_length alone or the longest run of whole words not longer than max_length
+@lru_cache(maxsize=None)
+def get_wrap_pattern(max_length):
+    return re.compile(rf'([^ ]{{{max_length + 1},}}|[^ ].{{0,{max_length - 1}}})(?: |\Z)')
+
+
+# Function to split words into lines of max_length, keeping whole words intact
+# Words are joined once and lines are sliced from that string by one findall(), without building lines word by word
+# Same result as the previous Publication.split_text(): a word is added if the line stays within max_length,
+# and a first word of max_length or more characters is preceded by an empty line
+def wrap_words(words, max_length):
+    if not words:
+        return []
+    if max_length < 1:
+        # Every word is longer than the limit
+        return ['', *words]
+    lines = get_wrap_pattern(max_length).findall(' '.join(words))
+    if len(words[0]) >= max_length:
+        lines.insert(0, '')
+    return lines
+
+
+# Function to wrap text into lines of max_length
+def wrap_text(text, max_length):
+    return '\n'.join(wrap_words(text.split(), max_length))
+
+
+# Function to wrap each line of the list into lines of max_length and join them into one text
+def wrap_lines(lines, max_length):
+    wrapped_lines = []
+    for line in lines:
+        wrapped_lines.extend(wrap_words(line.split(), max_length))
+    return '\n'.join(wrapped_lines)
+
+
+# Function to wrap each text of the list into lines of max_length
+def wrap_texts(texts, max_length):
+    return ['\n'.join(wrap_words(text.split(), max_length)) for text in texts]
+
+
+# Function to compare wrap_text() with the previous implementation on random texts from 1 KB to 10 MB
+def benchmark_wrap_text(sizes=(1 << 10, 1 << 15, 1 << 20, 10 << 20), max_length=50, seed=1):
+    # Previous Publication.split_text() implementation, used as reference for results and speed
+    def wrap_text_concat(text, max_length):
+        formatted_text = []
+        current_line = ""
+        for word in text.strip().split():
+            if len(current_line) + len(word) + 1 > max_length:
+                formatted_text.append(current_line)
+                current_line = word
+            else:
+                if current_line:
+                    current_line += " " + word
+                else:
+                    current_line = word
+        if current_line:
+            formatted_text.append(current_line)
+        return '\n'.join(formatted_text)
+
+    generator = random.Random(seed)
+    words = [''.join(generator.choices('abcdefghijklmnopqrstuvwxyz', k=generator.randint(1, 12)))
+             for _ in range(1000)] + ['a' * 60]
+    separators = [' '] * 20 + ['  ', '\n', '\t']
+
+    for size in sizes:
+        parts = []
+        length = 0
+        while length < size:
+            parts.append(generator.choice(words))
+            parts.append(generator.choice(separators))
+            length += len(parts[-2]) + 1
+        text = ''.join(parts)[:size]
+        repeats = max(1, (1 << 20) // size)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            expected = wrap_text_concat(text, max_length)
+        previous_time = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            result = wrap_text(text, max_length)
+        wrap_time = (time.perf_counter() - start) / repeats
+
+        print(f"{size / 1024:>8.0f} KB: split_text {previous_time * 1000:9.3f} ms, "
+              f"wrap_text {wrap_time * 1000:9.3f} ms ({previous_time / wrap_time:.1f}x faster), "
+              f"identical: {result == expected}")
+
+
+# Function to read a text file by chunks
+def iter_text_chunks(file_path, chunk_size=1 << 20):
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+# Function to split text chunks at whitespace, so that no word and no ' iz ' is split between pieces
+# Lowering and ' iz ' replacement of such pieces give the same result as for the whole text
+# Only the tail after the last whitespace run (the last word) is kept between chunks
+def iter_word_aligned_pieces(chunks):
+    # Carry is kept as a list of parts, so a long word is joined once and not on every chunk
+    carry_parts = []
+    for chunk in chunks:
+        carry_parts.append(chunk)
+        # Carry starts at a whitespace run, so without whitespace in the chunk the whole text stays in the carry
+        if not WHITESPACE_PATTERN.search(chunk):
+            continue
+        text = ''.join(carry_parts)
+        # Tail is found from the end of the text, so the cost does not depend on whitespace runs before it
+        carry_start = len(text) - REVERSED_CARRY_PATTERN.match(text[::-1]).end()
+        if carry_start:
+            yield text[:carry_start]
+        carry_parts = [text[carry_start:]]
+    carry = ''.join(carry_parts)
+    if carry:
+        yield carry
+
+
+# Function to capitalize the first letter of each sentence in text given by pieces,
+# same result as capitalize_sentences() for the joined text containing a delimiter
+def capitalize_sentences_stream(pieces):
+    at_start = True
+    # Whether the previous pieces ended with a delimiter and optional whitespace
+    after_delimiter = False
+    for piece in pieces:
+        if not piece:
+            continue
+        head = ''
+        if at_start:
+            # The first part is capitalized even if it starts with whitespace
+            head, piece = piece[0].capitalize(), piece[1:]
+            after_delimiter = head in SENTENCE_DELIMITERS
+            at_start = False
+        # Prepend a delimiter to capitalize a sentence start continued from the previous piece
+        prefix = '.' if after_delimiter else ''
+        text = SENTENCE_START_PATTERN.sub(lambda match: match.group(1) + match.group(2).capitalize(), prefix + piece)
+        stripped = text.rstrip()
+        if stripped:
+            after_delimiter = stripped[-1] in SENTENCE_DELIMITERS
+        yield head + text[len(prefix):]
+
+
+# Function to read a text file object by chunks of given size, up to `limit` characters if it is not None
+def iter_file_object_chunks(file_object, chunk_size, limit=None):
+    while limit is None or limit > 0:
+        chunk = file_object.read(chunk_size if limit is None else min(chunk_size, limit))
+        if not chunk:
+            break
+        if limit is not None:
+            limit -= len(chunk)
+        yield chunk
+
+
+# Generator to normalize text given by chunks, same result as process_text() without printing
+# Input is read once: whitespace counting, lowering, ' iz ' fixing, collecting last words of complete sentences
+# and searching for the insertion phrase are done on each piece. The new sentence is known only at the end of input,
+# so the fixed text and the last words are kept in spooled temporary files (in memory up to spool_size bytes)
+# and are capitalized while being read back. Peak memory is bounded by the chunk size, the spool size
+# and the longest word, independently of the text size
+# If `stats` dictionary is given, whitespace and sentence counts are stored in it before the first piece is yielded
+def normalize_text_stream(chunks, stats=None, chunk_size=65536, spool_size=1 << 20):
+    whitespace_count = 0
+    sentences_count = 0
+    in_sentence = False
+    # Text of the current sentence after its last whitespace
+    last_word = ''
+    # Position of the insertion phrase in the fixed text, -1 if not found yet
+    phrase_position = -1
+    phrase_overlap = ''
+    fixed_length = 0
+
+    with tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+', encoding='utf-8', newline='') as text_spool, \
+            tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+', encoding='utf-8', newline='') as words_spool:
+        for piece in iter_word_aligned_pieces(chunks):
+            # Count whitespace of the original text
+            whitespace_count += len(piece) - sum(map(len, piece.split()))
+            fixed = IZ_PATTERN.sub(' is ', piece.lower())
+
+            # Collect last words of sentences: from the first word character to the next '.', '!' or '?'
+            parts = SENTENCE_END_SPLIT_PATTERN.split(fixed)
+            last_words = []
+            for index in range(0, len(parts), 2):
+                segment = parts[index]
+                if not in_sentence:
+                    match = WORD_CHAR_PATTERN.search(segment)
+                    if match is None:
+                        continue
+                    in_sentence = True
+                    segment = segment[match.start():]
+                if segment:
+                    if segment[-1].isspace():
+                        last_word = ''
+                    else:
+                        word = segment.rsplit(None, 1)[-1]
+                        last_word = last_word + word if len(word) == len(segment) else word
+                if index + 1 < len(parts):
+                    # Sentence is complete, its last word is kept without end punctuation
+                    last_words.append((last_word + parts[index + 1]).rstrip('.!?'))
+                    in_sentence = False
+                    last_word = ''
+            if last_words:
+                words_spool.write((' ' if sentences_count else '') + ' '.join(last_words))
+                sentences_count += len(last_words)
+
+            # Search for the first insertion phrase, also across piece boundaries
+            if phrase_position < 0:
+                search_text = phrase_overlap + fixed
+                found = search_text.find(INSERTION_PHRASE)
+                if found >= 0:
+                    phrase_position = fixed_length - len(phrase_overlap) + found
+                else:
+                    phrase_overlap = search_text[-(len(INSERTION_PHRASE) - 1):]
+
+            text_spool.write(fixed)
+            fixed_length += len(fixed)
+
+        if stats is not None:
+            stats['whitespace_count'] = whitespace_count
+            stats['sentences_count'] = sentences_count
+
+        insertion_point = phrase_position + len(INSERTION_PHRASE)
+        text_spool.seek(0)
+        words_spool.seek(0)
+
+        # Text before the insertion point, the new sentence and the rest of the text
+        def iter_final_pieces():
+            yield from iter_file_object_chunks(text_spool, chunk_size, insertion_point)
+            yield ' '
+            yield from iter_file_object_chunks(words_spool, chunk_size)
+            yield '.'
+            yield from iter_file_object_chunks(text_spool, chunk_size)
+
+        yield from capitalize_sentences_stream(iter_final_pieces())
+
+
+# Function to normalize the text given by chunks and print it as process_text() does
+def process_text_stream(chunks):
+    stats = {}
+    pieces = normalize_text_stream(chunks, stats)
+    # Input is read completely before the first piece
+    first_piece = next(pieces)
+    print(f"Number of whitespace characters: {stats['whitespace_count']}\n")
+    sys.stdout.write(first_piece)
+    for piece in pieces:
+        sys.stdout.write(piece)
+    sys.stdout.write('\n')
+
+
 # Main function to normalize the text from letter case point of view
 def process_text(inp_text):
     # Step 1: Convert to lowercase